@@ -7,6 +7,9 @@ import type React from "react";
 import { statusDot } from "../platform/display.js";
 import type { Agent } from "./types.js";
 
+/** Rule under the header row; spans the padded columns plus the status dot. */
+const HEADER_RULE = "─".repeat(60);
+
 interface AgentListProps {
   agents: Agent[];
 }
@@ -38,7 +41,7 @@ export function AgentList({ agents }: AgentListProps): React.ReactElement {
         </Text>
       </Box>
       <Box>
-        <Text dimColor>{"─".repeat(60)}</Text>
+        <Text dimColor>{HEADER_RULE}</Text>
       </Box>
 
       {agents.map((agent) => (
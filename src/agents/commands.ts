@@ -42,12 +42,12 @@ export async function runAgentsList(
   }
 
   if (!process.stdout.isTTY) {
+    let out = "";
     for (const a of agents) {
       const dot = a.available ? "✓" : "✗";
-      process.stdout.write(
-        `${dot} ${a.name.padEnd(20)} ${a.domain.padEnd(12)} ${(a.protocols ?? ["agui"]).join(",")}\n`,
-      );
+      out += `${dot} ${a.name.padEnd(20)} ${a.domain.padEnd(12)} ${(a.protocols ?? ["agui"]).join(",")}\n`;
     }
+    if (out) process.stdout.write(out);
     return;
   }
 
@@ -65,11 +65,17 @@ export async function runAgentsInfo(name: string, globalOpts: GlobalOpts): Promi
     process.exit(3);
   }
 
-  process.stdout.write(`\nAgent: ${agent.displayName}\n`);
-  process.stdout.write(`  Name:        ${agent.name}\n`);
-  process.stdout.write(`  Domain:      ${agent.domain}\n`);
-  process.stdout.write(`  Protocols:   ${(agent.protocols ?? ["agui"]).join(", ")}\n`);
-  process.stdout.write(`  Available:   ${agent.available ? "yes" : "no"}\n`);
-  process.stdout.write(`  Endpoint:    ${agent.endpoint}\n`);
-  process.stdout.write(`  Description: ${agent.description}\n\n`);
+  process.stdout.write(
+    [
+      "",
+      `Agent: ${agent.displayName}`,
+      `  Name:        ${agent.name}`,
+      `  Domain:      ${agent.domain}`,
+      `  Protocols:   ${(agent.protocols ?? ["agui"]).join(", ")}`,
+      `  Available:   ${agent.available ? "yes" : "no"}`,
+      `  Endpoint:    ${agent.endpoint}`,
+      `  Description: ${agent.description}`,
+      "\n",
+    ].join("\n"),
+  );
 }
@@ -87,8 +87,12 @@ function getMachineSeed(): string {
   return `${hostname()}-${info.uid}-${info.username}`;
 }
 
+/** The seed is fixed for the life of the process, so derive (and shell out for it) once. */
+let derivedKey: Buffer | undefined;
+
 function deriveKey(): Buffer {
-  return pbkdf2Sync(getMachineSeed(), SALT, PBKDF2_ITERATIONS, KEY_LEN, "sha256");
+  derivedKey ??= pbkdf2Sync(getMachineSeed(), SALT, PBKDF2_ITERATIONS, KEY_LEN, "sha256");
+  return derivedKey;
 }
 
 /** Encrypt plaintext → Buffer.  Format: [12-byte IV][16-byte auth tag][ciphertext] */
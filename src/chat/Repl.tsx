@@ -142,6 +142,13 @@ const SLASH_COMMANDS: SlashCommand[] = [
   { name: "/help", description: "Show available commands" },
 ];
 
+/** Picker match keys (name without "/", lowercased description), built once. */
+const SLASH_COMMAND_KEYS = SLASH_COMMANDS.map((command) => ({
+  command,
+  name: command.name.slice(1),
+  description: command.description.toLowerCase(),
+}));
+
 // ---------------------------------------------------------------------------
 // SlashPicker
 // ---------------------------------------------------------------------------
@@ -800,6 +807,8 @@ export function Repl({
     if (toolDiffSeenRef.current.has(toolCallId)) return;
     const name = toolNameByCallIdRef.current.get(toolCallId) ?? "tool";
     const argsJson = toolArgsBufferRef.current.get(toolCallId);
+    // Args are complete at TOOL_CALL_END and tried then; don't re-parse them for the result.
+    if (resultContent === undefined) toolArgsBufferRef.current.delete(toolCallId);
     const patch = patchFromToolCall(name, argsJson, resultContent);
     if (!patch) return;
     toolDiffSeenRef.current.add(toolCallId);
@@ -902,9 +911,11 @@ export function Repl({
     if (!input?.startsWith("/")) return [];
     const query = input.slice(1).toLowerCase().trim();
     if (query === "") return SLASH_COMMANDS;
-    return SLASH_COMMANDS.filter(
-      (c) => c.name.slice(1).includes(query) || c.description.toLowerCase().includes(query),
-    );
+    const matches: SlashCommand[] = [];
+    for (const k of SLASH_COMMAND_KEYS) {
+      if (k.name.includes(query) || k.description.includes(query)) matches.push(k.command);
+    }
+    return matches;
   }, [input]);
 
   const showPicker =
@@ -9,6 +9,7 @@ import { randomUUID } from "node:crypto";
 import { existsSync, mkdirSync, readFileSync, readdirSync, writeFileSync } from "node:fs";
 import { join } from "node:path";
 import { sessionsDir } from "../platform/config.js";
+import { readStringSpan, scanTopLevelFields } from "./json-scan.js";
 
 // ---------------------------------------------------------------------------
 // Types
@@ -93,36 +94,56 @@ function ensureSessionsDir(): string {
 
 /**
  * Persist a ChatSession to disk.
- * Applies rolling window before saving.
+ * Applies rolling window before saving. Metadata (including `conversationId`) is
+ * written ahead of the message history so {@link patchSessionConversationId} can
+ * read it without scanning past the messages.
  */
 export function saveSession(session: ChatSession): void {
   const dir = ensureSessionsDir();
   const path = join(dir, `${session.sessionId}.json`);
-  const trimmed = applyRollingWindow(session);
-  writeFileSync(path, `${JSON.stringify(trimmed, null, 2)}\n`, "utf8");
+  const { messages, memoryContext, ...meta } = applyRollingWindow(session);
+  const ordered = { ...meta, messages, memoryContext };
+  writeFileSync(path, `${JSON.stringify(ordered, null, 2)}\n`, "utf8");
 }
 
 /** Persist server conversation id without rewriting message history (e.g. after first stream). */
 export function patchSessionConversationId(sessionId: string, conversationId: string): void {
-  const existing = loadSession(sessionId);
+  const raw = readSessionFile(sessionId);
+  if (raw === null) return;
+  // The stream re-announces the same id every turn: check it without parsing the history.
+  const fields = scanTopLevelFields(raw, ["conversationId"]);
+  if (readStringSpan(raw, fields.get("conversationId")) === conversationId) return;
+  const existing = parseSession(raw);
   if (!existing) return;
-  if (existing.conversationId === conversationId) return;
   saveSession({ ...existing, conversationId });
 }
 
-/**
- * Load a session by ID. Returns null if not found.
- */
-export function loadSession(id: string): ChatSession | null {
+function readSessionFile(id: string): string | null {
   const path = join(sessionsDir(), `${id}.json`);
   if (!existsSync(path)) return null;
   try {
-    return JSON.parse(readFileSync(path, "utf8")) as ChatSession;
+    return readFileSync(path, "utf8");
+  } catch {
+    return null;
+  }
+}
+
+function parseSession(raw: string): ChatSession | null {
+  try {
+    return JSON.parse(raw) as ChatSession;
   } catch {
     return null;
   }
 }
 
+/**
+ * Load a session by ID. Returns null if not found.
+ */
+export function loadSession(id: string): ChatSession | null {
+  const raw = readSessionFile(id);
+  return raw === null ? null : parseSession(raw);
+}
+
 /**
  * List all saved sessions (most recent first).
  */
@@ -0,0 +1,151 @@
+/**
+ * Top-level JSON object field scanner.
+ *
+ * Walks a (possibly truncated) JSON object once, tracking string state and
+ * nesting depth, and reports where the complete top-level values for the
+ * requested keys start and end. Nothing else is materialized: nested objects
+ * and large string values (file contents in tool args, message arrays) are
+ * skipped over, not parsed.
+ */
+
+export interface JsonValueSpan {
+  /** Offset of the first character of the value. */
+  start: number;
+  /** Offset just past the last character of the value. */
+  end: number;
+}
+
+const QUOTE = 0x22; // "
+const BACKSLASH = 0x5c; // \
+const COLON = 0x3a; // :
+const COMMA = 0x2c; // ,
+const OPEN_BRACE = 0x7b; // {
+const CLOSE_BRACE = 0x7d; // }
+const OPEN_BRACKET = 0x5b; // [
+const CLOSE_BRACKET = 0x5d; // ]
+
+function isWhitespace(c: number): boolean {
+  return c === 0x20 || c === 0x0a || c === 0x0d || c === 0x09;
+}
+
+function skipWhitespace(src: string, i: number): number {
+  while (i < src.length && isWhitespace(src.charCodeAt(i))) i++;
+  return i;
+}
+
+/**
+ * Index just past the closing quote of the string opening at `i`, or -1 if unterminated.
+ * Jumps between quotes with native `indexOf`; a quote preceded by an odd run of
+ * backslashes is escaped.
+ */
+function skipString(src: string, i: number): number {
+  let j = i + 1;
+  for (;;) {
+    j = src.indexOf('"', j);
+    if (j === -1) return -1;
+    let k = j - 1;
+    while (src.charCodeAt(k) === BACKSLASH) k--;
+    if ((j - k) % 2 === 1) return j + 1;
+    j++;
+  }
+}
+
+/** Index just past the object/array opening at `i`, or -1 if it is not closed yet. */
+function skipContainer(src: string, i: number): number {
+  let depth = 0;
+  for (let j = i; j < src.length; j++) {
+    const c = src.charCodeAt(j);
+    if (c === QUOTE) {
+      const next = skipString(src, j);
+      if (next === -1) return -1;
+      j = next - 1;
+    } else if (c === OPEN_BRACE || c === OPEN_BRACKET) {
+      depth++;
+    } else if (c === CLOSE_BRACE || c === CLOSE_BRACKET) {
+      depth--;
+      if (depth === 0) return j + 1;
+    }
+  }
+  return -1;
+}
+
+/** Index just past a number / literal, or -1 if the buffer ends before a delimiter. */
+function skipScalar(src: string, i: number): number {
+  for (let j = i; j < src.length; j++) {
+    const c = src.charCodeAt(j);
+    if (c === COMMA || c === CLOSE_BRACE || isWhitespace(c)) return j;
+  }
+  return -1;
+}
+
+function skipValue(src: string, i: number): number {
+  const c = src.charCodeAt(i);
+  if (c === QUOTE) return skipString(src, i);
+  if (c === OPEN_BRACE || c === OPEN_BRACKET) return skipContainer(src, i);
+  return skipScalar(src, i);
+}
+
+function decodeKey(raw: string): string {
+  if (!raw.includes("\\")) return raw;
+  try {
+    return JSON.parse(`"${raw}"`) as string;
+  } catch {
+    return raw;
+  }
+}
+
+/**
+ * Locate the top-level values for `keys` in a JSON object without parsing it.
+ * Stops at the first structural problem or at the end of a truncated buffer,
+ * returning whatever complete fields were seen so far. Returns as soon as every
+ * requested key has been found, without reading the rest of the object; a
+ * duplicated key therefore keeps its first value, whereas `JSON.parse` keeps
+ * the last.
+ */
+export function scanTopLevelFields(
+  json: string,
+  keys: Iterable<string>,
+): Map<string, JsonValueSpan> {
+  const wanted = new Set(keys);
+  const fields = new Map<string, JsonValueSpan>();
+
+  let i = skipWhitespace(json, 0);
+  if (json.charCodeAt(i) !== OPEN_BRACE) return fields;
+  i = skipWhitespace(json, i + 1);
+
+  while (i < json.length) {
+    if (json.charCodeAt(i) !== QUOTE) break;
+    const keyEnd = skipString(json, i);
+    if (keyEnd === -1) break;
+    const key = decodeKey(json.slice(i + 1, keyEnd - 1));
+
+    i = skipWhitespace(json, keyEnd);
+    if (json.charCodeAt(i) !== COLON) break;
+    i = skipWhitespace(json, i + 1);
+    if (i >= json.length) break;
+
+    const valueEnd = skipValue(json, i);
+    if (valueEnd === -1) break;
+    if (wanted.has(key) && !fields.has(key)) {
+      fields.set(key, { start: i, end: valueEnd });
+      if (fields.size === wanted.size) break;
+    }
+
+    i = skipWhitespace(json, valueEnd);
+    if (json.charCodeAt(i) !== COMMA) break;
+    i = skipWhitespace(json, i + 1);
+  }
+
+  return fields;
+}
+
+/** Decode a span returned by {@link scanTopLevelFields} if it holds a string value. */
+export function readStringSpan(json: string, span: JsonValueSpan | undefined): string | undefined {
+  if (!span || json.charCodeAt(span.start) !== QUOTE) return undefined;
+  const raw = json.slice(span.start, span.end);
+  try {
+    return JSON.parse(raw) as string;
+  } catch {
+    return raw.slice(1, -1);
+  }
+}
@@ -10,25 +10,50 @@ export interface MarkdownPartition {
   tailBlock: string;
 }
 
-/**
- * Split markdown into completed blocks (blank-line separated, respecting fenced code)
- * and a trailing incomplete block.
- */
-export function partitionMarkdown(source: string): MarkdownPartition {
-  if (!source) {
-    return { stableBlocks: [], tailBlock: "" };
+interface PartitionScan extends MarkdownPartition {
+  /**
+   * Offset just past the newline that ended the last flushed block. Scanning can
+   * resume here with a fresh state as long as the text before it does not change.
+   */
+  resumeAt: number;
+  /** Number of `stableBlocks` that end before `resumeAt`. */
+  resumeBlockCount: number;
+}
+
+/** Leading run of 3+ backticks or tildes that opens/closes a fence, or "" for other lines. */
+function fenceRun(line: string): string {
+  if (!line.startsWith("```") && !line.startsWith("~~~")) return "";
+  const ch = line[0];
+  let end = 3;
+  while (line[end] === ch) end++;
+  return line.slice(0, end);
+}
+
+function countOccurrences(text: string, needle: string): number {
+  let count = 0;
+  for (let i = text.indexOf(needle); i !== -1; i = text.indexOf(needle, i + needle.length)) {
+    count++;
   }
+  return count;
+}
 
-  const lines = source.split("\n");
+function scanBlocks(source: string, start: number): PartitionScan {
   const stableBlocks: string[] = [];
   let current: string[] = [];
   let inFence = false;
   let fenceMarker = "";
-
-  for (const line of lines) {
-    const fence = line.match(/^(`{3,}|~{3,})/);
-    if (fence) {
-      const marker = fence[1] ?? "";
+  let resumeAt = start;
+  let resumeBlockCount = 0;
+
+  let pos = start;
+  while (pos <= source.length) {
+    const nl = source.indexOf("\n", pos);
+    const lineEnd = nl === -1 ? source.length : nl;
+    const line = source.slice(pos, lineEnd);
+    pos = lineEnd + 1;
+
+    const marker = fenceRun(line);
+    if (marker) {
       if (!inFence) {
         inFence = true;
         fenceMarker = marker;
@@ -42,24 +67,39 @@ export function partitionMarkdown(source: string): MarkdownPartition {
       const text = current.join("\n").trimEnd();
       if (text) stableBlocks.push(text);
       current = [];
+      // A blank last line may still grow into content; only commit terminated ones.
+      if (nl !== -1) {
+        resumeAt = pos;
+        resumeBlockCount = stableBlocks.length;
+      }
       continue;
     }
 
     current.push(line);
   }
 
-  return { stableBlocks, tailBlock: current.join("\n") };
+  return { stableBlocks, tailBlock: current.join("\n"), resumeAt, resumeBlockCount };
+}
+
+/**
+ * Split markdown into completed blocks (blank-line separated, respecting fenced code)
+ * and a trailing incomplete block.
+ */
+export function partitionMarkdown(source: string): MarkdownPartition {
+  if (!source) {
+    return { stableBlocks: [], tailBlock: "" };
+  }
+  const { stableBlocks, tailBlock } = scanBlocks(source, 0);
+  return { stableBlocks, tailBlock };
 }
 
 /** Close an unterminated fenced code block for preview parsing. */
 export function remendMarkdownTail(tail: string): string {
   if (!tail) return tail;
-  const backticks = (tail.match(/```/g) || []).length;
-  if (backticks % 2 === 1) {
+  if (countOccurrences(tail, "```") % 2 === 1) {
     return `${tail}\n\`\`\``;
   }
-  const tildes = (tail.match(/~~~/g) || []).length;
-  if (tildes % 2 === 1) {
+  if (countOccurrences(tail, "~~~") % 2 === 1) {
     return `${tail}\n~~~`;
   }
   return tail;
@@ -77,16 +117,29 @@ export interface StreamDisplay {
 
 /**
  * Tracks stable block cache; tail is re-rendered in Ink on each sync().
+ *
+ * Text before the last committed block boundary is never re-scanned while the
+ * stream only appends, so each sync costs O(new text + tail), not O(total).
  */
 export class MarkdownStreamSession {
   private stableBlockTexts: string[] = [];
   private drainedStableCount = 0;
+  private frozenDisplay = "";
+  private scannedPrefix = "";
+  private scannedBlockCount = 0;
   private layoutWidth = getMarkdownLayoutWidth("assistant");
 
   reset(): void {
+    this.clearStable();
+    this.layoutWidth = getMarkdownLayoutWidth("assistant");
+  }
+
+  private clearStable(): void {
     this.stableBlockTexts = [];
     this.drainedStableCount = 0;
-    this.layoutWidth = getMarkdownLayoutWidth("assistant");
+    this.frozenDisplay = "";
+    this.scannedPrefix = "";
+    this.scannedBlockCount = 0;
   }
 
   /** Raw stable blocks not yet appended to Ink Static. */
@@ -104,20 +157,35 @@ export class MarkdownStreamSession {
   sync(fullText: string, layoutWidth?: number): StreamDisplay {
     const width = layoutWidth ?? getMarkdownLayoutWidth("assistant");
     if (width !== this.layoutWidth) {
-      this.stableBlockTexts = [];
-      this.drainedStableCount = 0;
+      this.clearStable();
       this.layoutWidth = width;
     }
 
-    const { stableBlocks, tailBlock } = partitionMarkdown(fullText);
+    if (!fullText.startsWith(this.scannedPrefix)) {
+      // Text was replaced, not appended: rescan from the top.
+      this.scannedPrefix = "";
+      this.scannedBlockCount = 0;
+    }
+
+    const scan = scanBlocks(fullText, this.scannedPrefix.length);
+    const base = this.scannedBlockCount;
 
-    while (this.stableBlockTexts.length < stableBlocks.length) {
+    while (this.stableBlockTexts.length < base + scan.stableBlocks.length) {
       const idx = this.stableBlockTexts.length;
-      this.stableBlockTexts.push(stableBlocks[idx] ?? "");
+      const block = scan.stableBlocks[idx - base] ?? "";
+      this.stableBlockTexts.push(block);
+      if (!block) continue;
+      this.frozenDisplay = this.frozenDisplay ? `${this.frozenDisplay}\n\n${block}` : block;
+    }
+
+    if (scan.resumeAt > this.scannedPrefix.length) {
+      this.scannedPrefix = fullText.slice(0, scan.resumeAt);
+      this.scannedBlockCount = base + scan.resumeBlockCount;
     }
 
+    const { tailBlock } = scan;
+    const { frozenDisplay } = this;
     const tailDisplay = tailBlock ? remendMarkdownTail(tailBlock) : "";
-    const frozenDisplay = this.stableBlockTexts.filter(Boolean).join("\n\n");
     const fullDynamicDisplay = frozenDisplay
       ? tailDisplay
         ? `${frozenDisplay}\n\n${tailDisplay}`
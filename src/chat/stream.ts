@@ -316,14 +316,21 @@ export class AguiAdapter implements StreamAdapter {
     // Current SSE frame fields
     let eventType = "";
     let dataLines: string[] = [];
-    let fullText = "";
+    const textParts: string[] = [];
+    let drained = false;
 
     try {
       while (true) {
         const { done, value } = await reader.read();
-        if (done) break;
+        if (done) {
+          drained = true;
+          break;
+        }
 
-        buf += decoder.decode(value, { stream: true });
+        const chunk = decoder.decode(value, { stream: true });
+        buf += chunk;
+        // A large data line can span many reads; only re-split once it is terminated.
+        if (!chunk.includes("\n")) continue;
         const lines = buf.split("\n");
         buf = lines.pop() ?? "";
 
@@ -349,7 +356,7 @@ export class AguiAdapter implements StreamAdapter {
 
               const ev = this.mapEvent(et || (parsed.type as string) || "", parsed);
               if (ev) {
-                if (ev.type === "token") fullText += (ev as TokenEvent).text;
+                if (ev.type === "token") textParts.push((ev as TokenEvent).text);
                 yield ev;
                 if (ev.type === "done" || ev.type === "error") return;
               }
@@ -358,10 +365,13 @@ export class AguiAdapter implements StreamAdapter {
         }
       }
     } finally {
+      // Terminal event or consumer `break` before EOF: cancel the body so the
+      // server stops streaming and the connection is released immediately.
+      if (!drained) await reader.cancel().catch(() => {});
       reader.releaseLock();
     }
 
-    yield { type: "done", response: fullText };
+    yield { type: "done", response: textParts.join("") };
   }
 
   private mapEvent(eventType: string, parsed: Record<string, unknown>): StreamEvent | null {
@@ -1,22 +1,30 @@
 /** Best-effort shell command extraction from streaming tool-call JSON args. */
 
+const COMMAND_KEYS = ["command", "cmd", "script", "input", "code"] as const;
+const PARTIAL_COMMAND = /"(?:command|cmd)"\s*:\s*"((?:\\.|[^"\\])*)"/;
+
 export function commandFromToolArgsBuffer(buffer: string): string | undefined {
   const trimmed = buffer.trim();
   if (!trimmed) return undefined;
-  try {
-    const obj = JSON.parse(trimmed) as Record<string, unknown>;
-    for (const key of ["command", "cmd", "script", "input", "code"]) {
-      const v = obj[key];
-      if (typeof v === "string" && v.trim()) return v.trim();
-    }
-  } catch {
-    const m = trimmed.match(/"(?:command|cmd)"\s*:\s*"((?:\\.|[^"\\])*)"/);
-    if (m?.[1]) {
-      try {
-        return JSON.parse(`"${m[1]}"`) as string;
-      } catch {
-        return m[1];
+  // Called on every TOOL_CALL_ARGS delta: only a closed `{…}` buffer is worth a full parse.
+  if (trimmed.startsWith("{") && trimmed.endsWith("}")) {
+    try {
+      const obj = JSON.parse(trimmed) as Record<string, unknown>;
+      for (const key of COMMAND_KEYS) {
+        const v = obj[key];
+        if (typeof v === "string" && v.trim()) return v.trim();
       }
+      return undefined;
+    } catch {
+      /* not complete JSON yet — fall through to the partial match */
+    }
+  }
+  const m = PARTIAL_COMMAND.exec(trimmed);
+  if (m?.[1]) {
+    try {
+      return JSON.parse(`"${m[1]}"`) as string;
+    } catch {
+      return m[1];
     }
   }
   return undefined;
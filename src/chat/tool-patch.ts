@@ -9,15 +9,56 @@ export interface ToolPatch {
   unifiedDiff: string;
 }
 
-const FILE_TOOL_NAME =
-  /write|edit|patch|update|replace|str_replace|insert|create|apply|file|notebook/i;
+// Field names probed on every tool-call payload; hoisted so lookups don't rebuild them per call.
+const PATH_KEYS = ["path", "file_path", "filePath", "filename", "file"] as const;
+const OLD_TEXT_KEYS = [
+  "old_string",
+  "oldString",
+  "old_text",
+  "oldText",
+  "original",
+  "before",
+] as const;
+const NEW_TEXT_KEYS = [
+  "new_string",
+  "newString",
+  "new_text",
+  "newText",
+  "replacement",
+  "after",
+  "content",
+] as const;
+const ENVELOPE_KEYS = ["result", "data", "output", "value", "payload"] as const;
+const UNIFIED_DIFF_KEYS = [
+  "patch",
+  "diff",
+  "unified_diff",
+  "unifiedDiff",
+  "unified",
+  "hunk",
+] as const;
+const MESSAGE_KEYS = ["message", "summary", "status"] as const;
+/** Substrings of (lowercased) tool names that edit files; covers str_replace, apply_patch, ... */
+const FILE_TOOL_NAME_PARTS = [
+  "write",
+  "edit",
+  "patch",
+  "update",
+  "replace",
+  "insert",
+  "create",
+  "apply",
+  "file",
+  "notebook",
+] as const;
 
 function isFileToolName(name: string): boolean {
-  return FILE_TOOL_NAME.test(name.replace(/[^a-zA-Z0-9_]/g, "_"));
+  const n = name.toLowerCase();
+  return FILE_TOOL_NAME_PARTS.some((part) => n.includes(part));
 }
 
 function readPath(obj: Record<string, unknown>): string | undefined {
-  for (const key of ["path", "file_path", "filePath", "filename", "file"]) {
+  for (const key of PATH_KEYS) {
     const v = obj[key];
     if (typeof v === "string" && v.trim()) return v.trim();
   }
@@ -25,26 +66,16 @@ function readPath(obj: Record<string, unknown>): string | undefined {
 }
 
 function readOldNew(obj: Record<string, unknown>): { oldText: string; newText: string } | null {
-  const oldKeys = ["old_string", "oldString", "old_text", "oldText", "original", "before"];
-  const newKeys = [
-    "new_string",
-    "newString",
-    "new_text",
-    "newText",
-    "replacement",
-    "after",
-    "content",
-  ];
   let oldText: string | undefined;
   let newText: string | undefined;
-  for (const k of oldKeys) {
+  for (const k of OLD_TEXT_KEYS) {
     const v = obj[k];
     if (typeof v === "string") {
       oldText = v;
       break;
     }
   }
-  for (const k of newKeys) {
+  for (const k of NEW_TEXT_KEYS) {
     const v = obj[k];
     if (typeof v === "string") {
       newText = v;
@@ -57,7 +88,9 @@ function readOldNew(obj: Record<string, unknown>): { oldText: string; newText: s
 
 function parseJsonRecord(raw: string): Record<string, unknown> | null {
   const trimmed = raw.trim();
-  if (!trimmed) return null;
+  // Only `{…}` can parse to a record. Checking the ends first keeps plain-text results and
+  // partial TOOL_CALL_ARGS buffers off the (throwing) JSON.parse path.
+  if (!trimmed.startsWith("{") || !trimmed.endsWith("}")) return null;
   try {
     const parsed: unknown = JSON.parse(trimmed);
     if (parsed && typeof parsed === "object" && !Array.isArray(parsed)) {
@@ -70,7 +103,7 @@ function parseJsonRecord(raw: string): Record<string, unknown> | null {
 }
 
 function unwrapResultEnvelope(obj: Record<string, unknown>): Record<string, unknown> {
-  for (const key of ["result", "data", "output", "value", "payload"]) {
+  for (const key of ENVELOPE_KEYS) {
     const inner = obj[key];
     if (inner && typeof inner === "object" && !Array.isArray(inner)) {
       return inner as Record<string, unknown>;
@@ -84,7 +117,7 @@ function unwrapResultEnvelope(obj: Record<string, unknown>): Record<string, unkn
 }
 
 function patchFromUnifiedField(obj: Record<string, unknown>): ToolPatch | null {
-  for (const key of ["patch", "diff", "unified_diff", "unifiedDiff", "unified", "hunk"]) {
+  for (const key of UNIFIED_DIFF_KEYS) {
     const v = obj[key];
     if (typeof v === "string" && isUnifiedDiffText(v.trim())) {
       return { path: readPath(obj), unifiedDiff: v.trim() };
@@ -132,19 +165,21 @@ export function patchFromToolResult(toolName: string, content: string): ToolPatc
   }
 
   const root = unwrapResultEnvelope(obj);
-  const path = readPath(root) ?? readPath(obj);
+  // Most results have no envelope; probe the outer object again only when it differs.
+  const outer = root === obj ? null : obj;
+  const path = readPath(root) ?? (outer ? readPath(outer) : undefined);
 
-  const fromPatch = patchFromUnifiedField(root) ?? patchFromUnifiedField(obj);
+  const fromPatch = patchFromUnifiedField(root) ?? (outer ? patchFromUnifiedField(outer) : null);
   if (fromPatch) {
     return { path: fromPatch.path ?? path, unifiedDiff: fromPatch.unifiedDiff };
   }
 
-  const fromOldNew =
-    patchFromOldNew(root, path ?? toolName) ?? patchFromOldNew(obj, path ?? toolName);
+  const label = path ?? toolName;
+  const fromOldNew = patchFromOldNew(root, label) ?? (outer ? patchFromOldNew(outer, label) : null);
   if (fromOldNew) return fromOldNew;
 
   if (isFileToolName(toolName)) {
-    for (const key of ["message", "summary", "status"]) {
+    for (const key of MESSAGE_KEYS) {
       const v = root[key];
       if (typeof v === "string" && isUnifiedDiffText(v.trim())) {
         return { path, unifiedDiff: v.trim() };
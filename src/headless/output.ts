@@ -56,11 +56,11 @@ class TextWriter implements OutputWriter {
 // ---------------------------------------------------------------------------
 
 class JsonWriter implements OutputWriter {
-  private accumulated = "";
+  private parts: string[] = [];
 
   write(event: StreamEvent): void {
     if (event.type === "token") {
-      this.accumulated += event.text;
+      this.parts.push(event.text);
     }
     if (event.type === "error") {
       process.stderr.write(`${JSON.stringify({ error: event.message })}\n`);
@@ -69,7 +69,7 @@ class JsonWriter implements OutputWriter {
 
   flush(agentName: string): void {
     process.stdout.write(
-      `${JSON.stringify({ response: this.accumulated, agent: agentName, protocol: "agui" })}\n`,
+      `${JSON.stringify({ response: this.parts.join(""), agent: agentName, protocol: "agui" })}\n`,
     );
   }
 }
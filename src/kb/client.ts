@@ -32,6 +32,20 @@ function joinKbPath(base: string, path: string): string {
   return `${b}${p}`;
 }
 
+/** Characters a JSON text can start with; any other body is plain text and skips the parse. */
+const JSON_VALUE_START = /^\s*[[{"\dtfn-]/;
+
+/** Decode a KB response body: parsed JSON when valid, the raw text otherwise, null when empty. */
+export function parseKbBody(text: string): unknown {
+  if (text === "") return null;
+  if (!JSON_VALUE_START.test(text)) return text;
+  try {
+    return JSON.parse(text) as unknown;
+  } catch {
+    return text;
+  }
+}
+
 /** FastAPI `{chunk_id:path}` — preserve slashes inside chunk ids */
 export function chunkContentApiPath(chunkId: string): string {
   const id = chunkId.replace(/^\/+|\/+$/g, "");
@@ -77,17 +91,7 @@ export async function kbRequest<T = unknown>(
     body,
   });
 
-  const text = await res.text();
-  let parsed: unknown = text;
-  if (text !== "") {
-    try {
-      parsed = JSON.parse(text) as unknown;
-    } catch {
-      parsed = text;
-    }
-  } else {
-    parsed = null;
-  }
+  const parsed = parseKbBody(await res.text());
 
   if (!res.ok) {
     const detail =
@@ -53,20 +53,32 @@ export function renderDiff(oldText: string, newText: string, label: string): str
   return colored.join("\n");
 }
 
-/** Heuristic: unified diff hunk (---/+++/@@ or many +/- lines). */
+const HUNK_MARKER = "@@";
+const OLD_FILE_MARKER = "--- ";
+const NEW_FILE_MARKER = "+++ ";
+
+/** Heuristic: unified diff (---/+++ file headers, or an @@ hunk with +/- lines). */
 export function isUnifiedDiffText(text: string): boolean {
-  const lines = text.split("\n");
-  const hasHeader =
-    lines.some((l) => l.startsWith("--- ")) && lines.some((l) => l.startsWith("+++ "));
-  const hasHunk = lines.some((l) => l.startsWith("@@"));
-  if (hasHeader || (hasHunk && lines.some((l) => l.startsWith("+") || l.startsWith("-")))) {
-    return true;
+  // Runs on every rendered block and tool payload; prose can't match without these markers.
+  if (
+    !text.includes(HUNK_MARKER) &&
+    !(text.includes(OLD_FILE_MARKER) && text.includes(NEW_FILE_MARKER))
+  ) {
+    return false;
   }
-  const changeLines = lines.filter(
-    (l) =>
-      (l.startsWith("+") && !l.startsWith("+++")) || (l.startsWith("-") && !l.startsWith("---")),
-  );
-  return changeLines.length >= 6 && lines.some((l) => l.startsWith("@@"));
+
+  let oldHeader = false;
+  let newHeader = false;
+  let hunk = false;
+  let change = false;
+  for (const line of text.split("\n")) {
+    if (line.startsWith(OLD_FILE_MARKER)) oldHeader = true;
+    else if (line.startsWith(NEW_FILE_MARKER)) newHeader = true;
+    else if (line.startsWith(HUNK_MARKER)) hunk = true;
+    if (line.startsWith("+") || line.startsWith("-")) change = true;
+    if ((oldHeader && newHeader) || (hunk && change)) return true;
+  }
+  return false;
 }
 
 /** Color +/- and hunk headers in diff text already present in the stream. */
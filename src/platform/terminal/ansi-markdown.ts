@@ -23,7 +23,50 @@ export interface RenderMarkdownToAnsiOptions {
   forceRich?: boolean;
 }
 
-const MD_LINK_PLACEHOLDER = /\x00MDLINK(\d+)\x00/g;
+/** A whole `[label](http…)` link (kept as-is) or a bare http(s) URL (shortened), leftmost first. */
+const TABLE_LINK_OR_URL = /\[[^\]]*\]\(https?:\/\/[^)\s]+\)|https?:\/\/[^\s|)]+/g;
+
+/** `[label](href "title")`, with href and optional title captured loosely for sanitising. */
+const MARKDOWN_LINK = /\[([^\]]*)\]\(([^)\s]+)(?:\s+"[^"]*")?\)/g;
+
+/** Rendered outputs kept for re-renders of the same message (Ink re-mounts, resize back). */
+const RENDER_CACHE_MAX = 128;
+
+interface CachedRender {
+  source: string;
+  ansi: string;
+}
+
+/** LRU by insertion order: a hit is re-inserted so the oldest entry is always first. */
+const renderCache = new Map<string, CachedRender>();
+
+/** 32-bit FNV-1a over UTF-16 code units; cheap enough to run on every render. */
+function fnv1a(text: string): number {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    hash ^= text.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+}
+
+function cachedRender(key: string, source: string): string | undefined {
+  const hit = renderCache.get(key);
+  // Compare the source too: a hash collision must never show another message's output.
+  if (!hit || hit.source !== source) return undefined;
+  renderCache.delete(key);
+  renderCache.set(key, hit);
+  return hit.ansi;
+}
+
+function storeRender(key: string, source: string, ansi: string): void {
+  renderCache.delete(key);
+  renderCache.set(key, { source, ansi });
+  if (renderCache.size > RENDER_CACHE_MAX) {
+    const oldest = renderCache.keys().next().value;
+    if (oldest !== undefined) renderCache.delete(oldest);
+  }
+}
 
 /** marked-terminal renders links (OSC 8 when supported). Do not pre-inject OSC sequences. */
 function preprocessSource(source: string): string {
@@ -32,15 +75,13 @@ function preprocessSource(source: string): string {
 
 /** Drop markdown links whose href is not a safe http(s) URL (avoids OSC 8 opening garbage). */
 function sanitizeMarkdownLinkHrefs(source: string): string {
-  return source.replace(
-    /\[([^\]]*)\]\(([^)\s]+)(?:\s+"[^"]*")?\)/g,
-    (full, label: string, href: string) => {
-      const h = href.trim();
-      if (isHttpUrl(h)) return full;
-      if (label && h && label !== h) return `${label} (${h})`;
-      return label || h || full;
-    },
-  );
+  if (!source.includes("](")) return source;
+  return source.replace(MARKDOWN_LINK, (full, label: string, href: string) => {
+    const h = href.trim();
+    if (isHttpUrl(h)) return full;
+    if (label && h && label !== h) return `${label} (${h})`;
+    return label || h || full;
+  });
 }
 
 function isHttpUrl(value: string): boolean {
@@ -54,22 +95,14 @@ function isHttpUrl(value: string): boolean {
 
 /** Shorten bare URL text in table rows; never mutate URLs inside `[label](url)` hrefs. */
 function shortenTableUrls(source: string, maxLen = 56): string {
+  // Most answers have no table or no URL; skip the per-line split entirely.
+  if (!source.includes("|") || !source.includes("http")) return source;
   return source
     .split("\n")
     .map((line) => {
       if (!line.trim().startsWith("|")) return line;
-      const protectedLinks: string[] = [];
-      const masked = line.replace(/\[([^\]]*)\]\((https?:\/\/[^)\s]+)\)/g, (link) => {
-        const id = protectedLinks.length;
-        protectedLinks.push(link);
-        return `\x00MDLINK${id}\x00`;
-      });
-      const shortened = masked.replace(/https?:\/\/[^\s|)]+/g, (url) =>
-        shortenUrlForDisplay(url, maxLen),
-      );
-      return shortened.replace(
-        MD_LINK_PLACEHOLDER,
-        (_, id: string) => protectedLinks[Number(id)] ?? "",
+      return line.replace(TABLE_LINK_OR_URL, (match) =>
+        match.startsWith("[") ? match : shortenUrlForDisplay(match, maxLen),
       );
     })
     .join("\n");
@@ -86,6 +119,24 @@ function shortenUrlForDisplay(url: string, maxLen: number): string {
   }
 }
 
+/** Configured parsers by content width; a resize drag can visit many widths, so keep a few. */
+const MARKED_CACHE_MAX = 8;
+const markedByWidth = new Map<number, Marked>();
+
+/** Marked + marked-terminal setup is costly and stateless across parses: build once per width. */
+function markedForWidth(width: number): Marked {
+  let instance = markedByWidth.get(width);
+  if (!instance) {
+    instance = createMarked(width);
+    markedByWidth.set(width, instance);
+    if (markedByWidth.size > MARKED_CACHE_MAX) {
+      const oldest = markedByWidth.keys().next().value;
+      if (oldest !== undefined) markedByWidth.delete(oldest);
+    }
+  }
+  return instance;
+}
+
 function createMarked(width: number): Marked {
   const contentWidth = Math.max(20, width);
   const instance = new Marked({ gfm: true, breaks: false });
@@ -118,11 +169,16 @@ export function renderMarkdownToAnsi(
   }
 
   const caps = getTerminalCapabilities();
-  const width = options.width ?? caps.width ?? getTerminalWidth();
+  const width = Math.max(20, options.width ?? caps.width ?? getTerminalWidth());
+  const wantOsc8 = options.osc8Links ?? (process.env.CAIPE_HYPERLINKS === "1" && caps.osc8Links);
+
+  const cacheKey = `${fnv1a(trimmed).toString(16)}:${width}:${wantOsc8 ? 1 : 0}`;
+  const cached = cachedRender(cacheKey, trimmed);
+  if (cached !== undefined) return cached;
+
   const input = preprocessSource(trimmed);
-  const marked = createMarked(Math.max(20, width));
+  const marked = markedForWidth(width);
 
-  const wantOsc8 = options.osc8Links ?? (process.env.CAIPE_HYPERLINKS === "1" && caps.osc8Links);
   const prevForce = process.env.FORCE_HYPERLINK;
   if (!wantOsc8) process.env.FORCE_HYPERLINK = "0";
 
@@ -136,7 +192,10 @@ export function renderMarkdownToAnsi(
     }
   }
 
-  return typeof out === "string" ? out.trimEnd() : plainTextFromMarkdown(trimmed);
+  if (typeof out !== "string") return plainTextFromMarkdown(trimmed);
+  const ansi = out.trimEnd();
+  storeRender(cacheKey, trimmed, ansi);
+  return ansi;
 }
 
 export { plainTextFromMarkdown };
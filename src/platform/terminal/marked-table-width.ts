@@ -6,6 +6,8 @@ import chalk from "chalk";
 import Table from "cli-table3";
 import type { MarkedExtension, Parser, Tokens } from "marked";
 
+const ANSI_SGR = /\x1b\[[0-9;]*m/g;
+
 function inlineCell(parser: Parser, cell: Tokens.TableCell): string {
   return parser.parseInline(cell.tokens).trim();
 }
@@ -105,7 +107,7 @@ export function markedTableWidthExtension(contentWidth: number): MarkedExtension
 
 /** Longest visible line length (ignores ANSI escapes). */
 export function maxVisibleLineWidth(text: string): number {
-  const strip = text.replace(/\x1b\[[0-9;]*m/g, "");
+  const strip = text.replace(ANSI_SGR, "");
   let max = 0;
   for (const line of strip.split("\n")) {
     max = Math.max(max, line.length);
@@ -1,11 +1,17 @@
 /** Strip common markdown markers for stdout / plain fallback. */
 
+const HEADING = /^#{1,6}\s+/gm;
+const BOLD = /\*\*([^*]+)\*\*/g;
+const ITALIC = /\*([^*]+)\*/g;
+const INLINE_CODE = /`([^`]+)`/g;
+const LINK = /\[([^\]]+)\]\([^)]+\)/g;
+
 export function plainTextFromMarkdown(source: string): string {
   return source
-    .replace(/^#{1,6}\s+/gm, "")
-    .replace(/\*\*([^*]+)\*\*/g, "$1")
-    .replace(/\*([^*]+)\*/g, "$1")
-    .replace(/`([^`]+)`/g, "$1")
-    .replace(/\[([^\]]+)\]\([^)]+\)/g, "$1")
+    .replace(HEADING, "")
+    .replace(BOLD, "$1")
+    .replace(ITALIC, "$1")
+    .replace(INLINE_CODE, "$1")
+    .replace(LINK, "$1")
     .trimEnd();
 }
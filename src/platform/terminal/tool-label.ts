@@ -1,11 +1,16 @@
 /** Claude-style tool tree labels (Update(path), etc.). */
 
+const PATH_KEYS = ["path", "file_path", "filePath", "filename"] as const;
+const FILE_TOOL_NAME_PARTS = ["write", "edit", "patch", "update", "replace", "file"] as const;
+
 export function pathFromToolDetail(detail: string): string | undefined {
   const trimmed = detail.trim();
   if (!trimmed) return undefined;
+  // Details are usually plain shell commands; skip the parse attempt unless it looks like JSON.
+  if (!trimmed.startsWith("{")) return trimmed;
   try {
     const obj = JSON.parse(trimmed) as Record<string, unknown>;
-    for (const key of ["path", "file_path", "filePath", "filename"]) {
+    for (const key of PATH_KEYS) {
       const v = obj[key];
       if (typeof v === "string" && v.trim()) return v.trim();
     }
@@ -16,9 +21,9 @@ export function pathFromToolDetail(detail: string): string | undefined {
 }
 
 export function formatToolTreeLabel(name: string, detail?: string): string {
-  const n = name.toLowerCase().replace(/[^a-z0-9_]/g, "_");
+  const n = name.toLowerCase();
   const path = detail ? pathFromToolDetail(detail) : undefined;
-  if (path && /write|edit|patch|update|replace|str_replace|file/.test(n)) {
+  if (path && FILE_TOOL_NAME_PARTS.some((part) => n.includes(part))) {
     return `Update(${path})`;
   }
   if (path && (n.includes("bash") || n.includes("shell") || n.includes("terminal"))) {
@@ -38,13 +38,13 @@ export async function runSkillsList(opts: {
   }
 
   if (!process.stdout.isTTY) {
-    // Non-interactive: print plain text table
+    // Non-interactive: print plain text table (one write for the whole table)
+    let out = "";
     for (const skill of list) {
       const mark = installedNames.has(skill.name) ? "✓" : " ";
-      process.stdout.write(
-        `${mark} ${skill.name.padEnd(30)} v${skill.version.padEnd(8)} ${skill.description}\n`,
-      );
+      out += `${mark} ${skill.name.padEnd(30)} v${skill.version.padEnd(8)} ${skill.description}\n`;
     }
+    if (out) process.stdout.write(out);
     return;
   }
 
@@ -29,12 +29,15 @@ export interface InstalledSkill {
 // Frontmatter parser (minimal YAML subset)
 // ---------------------------------------------------------------------------
 
+const FRONTMATTER = /^---\r?\n([\s\S]*?)\r?\n---/;
+const QUOTES = /^['"]|['"]$/g;
+
 /**
  * Extract YAML frontmatter from a Markdown string.
  * Returns parsed key-value pairs (strings only — sufficient for skill metadata).
  */
 function parseFrontmatter(content: string): Record<string, string> {
-  const match = content.match(/^---\r?\n([\s\S]*?)\r?\n---/);
+  const match = FRONTMATTER.exec(content);
   if (!match) return {};
   const yaml = match[1] ?? "";
   const result: Record<string, string> = {};
@@ -45,7 +48,7 @@ function parseFrontmatter(content: string): Record<string, string> {
     const val = line
       .slice(idx + 1)
       .trim()
-      .replace(/^['"]|['"]$/g, "");
+      .replace(QUOTES, "");
     result[key] = val;
   }
   return result;
@@ -1,3 +1,4 @@
+import { Writable } from "node:stream";
 import { render } from "ink";
 import React from "react";
 import { describe, expect, it } from "vitest";
@@ -23,16 +24,27 @@ describe("renderMarkdownToAnsi", () => {
     expect(ansi).not.toMatch(/\x1b\]8;;[^\x1b]*link/i);
   });
 
-  it("renders lists and headings without throwing in Ink", () => {
-    expect(() => {
-      render(
-        React.createElement(AnsiMarkdown, {
-          width: 80,
-          // biome-ignore lint/correctness/noChildrenProp: AnsiMarkdownProps.children is typed `string`, not ReactNode, so createElement's variadic-children form doesn't type-check here.
-          children: GFM_LIST,
-        }),
-      ).unmount();
-    }).not.toThrow();
+  it("renders lists and headings in Ink", () => {
+    // Debug mode writes each frame straight to this stream instead of the real stdout.
+    const frames: string[] = [];
+    const stdout = new Writable({
+      write(chunk, _encoding, callback) {
+        frames.push(String(chunk));
+        callback();
+      },
+    });
+    render(
+      React.createElement(AnsiMarkdown, {
+        width: 80,
+        // biome-ignore lint/correctness/noChildrenProp: AnsiMarkdownProps.children is typed `string`, not ReactNode, so createElement's variadic-children form doesn't type-check here.
+        children: GFM_LIST,
+      }),
+      { stdout: stdout as unknown as NodeJS.WriteStream, debug: true, patchConsole: false },
+    ).unmount();
+    const output = frames.join("");
+    expect(output).toContain("Available agents");
+    expect(output).toContain("agent-sre");
+    expect(output).toContain("SRE Agent");
   });
 
   it("strips to plain text when NO_COLOR", () => {
@@ -87,4 +99,13 @@ describe("renderMarkdownToAnsi", () => {
     expect(maxVisibleLineWidth(ansi)).toBeLessThanOrEqual(layoutW + 1);
     expect(tableBorderSlack(5)).toBeGreaterThan(0);
   });
+
+  it("serves repeat renders from cache but re-renders on width change", () => {
+    const md = "Some **bold** text that is long enough to reflow at a narrow terminal width.";
+    const wide = renderMarkdownToAnsi(md, { width: 100, forceRich: true });
+    expect(renderMarkdownToAnsi(md, { width: 100, forceRich: true })).toBe(wide);
+    const narrow = renderMarkdownToAnsi(md, { width: 30, forceRich: true });
+    expect(narrow).not.toBe(wide);
+    expect(maxVisibleLineWidth(narrow)).toBeLessThanOrEqual(31);
+  });
 });
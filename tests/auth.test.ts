@@ -7,11 +7,11 @@
  */
 
 import { createHash } from "node:crypto";
-import { beforeEach, describe, expect, it, vi } from "vitest";
+import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
 
 import { type TokenSet, clearTokens, loadTokens, storeTokens } from "../src/auth/keychain";
 // ── Import under test ────────────────────────────────────────────────────────
-import { generatePKCE } from "../src/auth/oauth";
+import { generatePKCE, loginDevice } from "../src/auth/oauth";
 import { AuthRequired, getValidToken, isExpired, refreshAccessToken } from "../src/auth/tokens";
 
 // ── Helpers ──────────────────────────────────────────────────────────────────
@@ -26,12 +26,26 @@ function makeTokens(overrides: Partial<TokenSet> = {}): TokenSet {
   };
 }
 
+function jsonResponse(body: unknown, status = 200): Promise<Response> {
+  return Promise.resolve(
+    new Response(JSON.stringify(body), {
+      status,
+      headers: { "Content-Type": "application/json" },
+    }),
+  );
+}
+
 function expiredTokens(): TokenSet {
   return makeTokens({
     accessTokenExpiry: new Date(Date.now() - 10_000).toISOString(),
   });
 }
 
+// Fetch stubs from vi.stubGlobal are undone after every test in this file.
+afterEach(() => {
+  vi.unstubAllGlobals();
+});
+
 // ── PKCE ─────────────────────────────────────────────────────────────────────
 
 describe("generatePKCE", () => {
@@ -134,45 +148,28 @@ describe("getValidToken", () => {
     await storeTokens(expiredTokens());
 
     // Mock fetch to simulate a refresh token response
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(
-        new Response(
-          JSON.stringify({
-            access_token: "new_access",
-            refresh_token: "new_refresh",
-            expires_in: 3600,
-          }),
-          { status: 200, headers: { "Content-Type": "application/json" } },
-        ),
-      ),
-    ) as unknown as typeof fetch;
-
-    try {
-      const token = await getValidToken(SERVER_URL);
-      expect(token).toBe("new_access");
-
-      // New token should be persisted
-      const stored = await loadTokens();
-      expect(stored?.accessToken).toBe("new_access");
-    } finally {
-      global.fetch = originalFetch;
-    }
+    vi.stubGlobal("fetch", () =>
+      jsonResponse({
+        access_token: "new_access",
+        refresh_token: "new_refresh",
+        expires_in: 3600,
+      }),
+    );
+
+    const token = await getValidToken(SERVER_URL);
+    expect(token).toBe("new_access");
+
+    // New token should be persisted
+    const stored = await loadTokens();
+    expect(stored?.accessToken).toBe("new_access");
   });
 
   it("throws AuthRequired when refresh fails", async () => {
     await storeTokens(expiredTokens());
 
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(new Response(JSON.stringify({ error: "invalid_grant" }), { status: 400 })),
-    ) as unknown as typeof fetch;
+    vi.stubGlobal("fetch", () => jsonResponse({ error: "invalid_grant" }, 400));
 
-    try {
-      await expect(getValidToken(SERVER_URL)).rejects.toBeInstanceOf(AuthRequired);
-    } finally {
-      global.fetch = originalFetch;
-    }
+    await expect(getValidToken(SERVER_URL)).rejects.toBeInstanceOf(AuthRequired);
   });
 
   it("throws AuthRequired when expired and no refresh token", async () => {
@@ -197,298 +194,140 @@ describe("loginDevice polling behavior", () => {
 
   const SERVER_URL = "https://caipe.test";
   const CLIENT_ID = "caipe-cli";
+  // Device code grant shared by every polling scenario; interval 0 polls immediately.
+  const DEVICE_CODE = {
+    device_code: "dc",
+    user_code: "ABCD-1234",
+    verification_uri: "https://caipe.test/activate",
+    expires_in: 300,
+    interval: 0,
+  };
+
+  // loginDevice prints the user-code box and poll dots; keep them out of the test log.
+  beforeEach(() => {
+    vi.spyOn(process.stdout, "write").mockImplementation(() => true);
+  });
+
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  // Record stderr; the returned function reads everything written so far.
+  const captureStderr = (): (() => string) => {
+    const chunks: string[] = [];
+    vi.spyOn(process.stderr, "write").mockImplementation((chunk) => {
+      chunks.push(String(chunk));
+      return true;
+    });
+    return () => chunks.join("");
+  };
+
+  // Turn process.exit into a throw so loginDevice unwinds instead of killing the worker.
+  const throwOnExit = () =>
+    vi.spyOn(process, "exit").mockImplementation((code) => {
+      throw new Error(`PROCESS_EXIT:${code}`);
+    });
 
   it("authorization_pending × 2 then access_token → success", async () => {
-    const { loginDevice } = await import("../src/auth/oauth");
     let callCount = 0;
-
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn((url: string) => {
-      const u = String(url);
+    vi.stubGlobal("fetch", (url: string) => {
       // Device code request
-      if (u.includes("/oauth/device/code")) {
-        return Promise.resolve(
-          new Response(
-            JSON.stringify({
-              device_code: "device_code_abc",
-              user_code: "ABCD-1234",
-              verification_uri: "https://caipe.test/activate",
-              expires_in: 300,
-              interval: 0, // poll immediately in tests
-            }),
-            { status: 200, headers: { "Content-Type": "application/json" } },
-          ),
-        );
+      if (String(url).includes("/oauth/device/code")) {
+        return jsonResponse(DEVICE_CODE);
       }
       // Token poll
       callCount++;
       if (callCount <= 2) {
-        return Promise.resolve(
-          new Response(JSON.stringify({ error: "authorization_pending" }), {
-            status: 400,
-            headers: { "Content-Type": "application/json" },
-          }),
-        );
+        return jsonResponse({ error: "authorization_pending" }, 400);
       }
-      return Promise.resolve(
-        new Response(
-          JSON.stringify({
-            access_token: "device_access",
-            refresh_token: "device_refresh",
-            expires_in: 3600,
-          }),
-          { status: 200, headers: { "Content-Type": "application/json" } },
-        ),
-      );
-    }) as unknown as typeof fetch;
-
-    try {
-      await loginDevice(SERVER_URL, CLIENT_ID);
-      const stored = await loadTokens();
-      expect(stored?.accessToken).toBe("device_access");
-      expect(callCount).toBe(3);
-    } finally {
-      global.fetch = originalFetch;
-    }
+      return jsonResponse({
+        access_token: "device_access",
+        refresh_token: "device_refresh",
+        expires_in: 3600,
+      });
+    });
+
+    await loginDevice(SERVER_URL, CLIENT_ID);
+    const stored = await loadTokens();
+    expect(stored?.accessToken).toBe("device_access");
+    expect(callCount).toBe(3);
   });
 
   it("slow_down increases poll interval by 5s", async () => {
-    // We test this by capturing the delay times via a mocked setTimeout
-    // and verifying the second poll waited 5s longer than the first.
-    // Full behavioral test is in integration; here we just assert the
-    // module handles the response without throwing.
-    const { loginDevice } = await import("../src/auth/oauth");
+    // Capture the poll delays via a setTimeout spy that fires immediately,
+    // so the second poll's extra 5s is asserted rather than waited out.
     let callCount = 0;
-
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn((url: string) => {
-      const u = String(url);
-      if (u.includes("/device/code")) {
-        return Promise.resolve(
-          new Response(
-            JSON.stringify({
-              device_code: "dc",
-              user_code: "WXYZ-5678",
-              verification_uri: "https://caipe.test/activate",
-              expires_in: 300,
-              interval: 0,
-            }),
-            { status: 200, headers: { "Content-Type": "application/json" } },
-          ),
-        );
+    const delays: number[] = [];
+    vi.spyOn(globalThis, "setTimeout").mockImplementation(((fn: () => void, ms?: number) => {
+      delays.push(ms ?? 0);
+      fn();
+      return 0;
+    }) as unknown as typeof setTimeout);
+
+    vi.stubGlobal("fetch", (url: string) => {
+      if (String(url).includes("/device/code")) {
+        return jsonResponse(DEVICE_CODE);
       }
       callCount++;
       if (callCount === 1) {
-        return Promise.resolve(
-          new Response(JSON.stringify({ error: "slow_down" }), {
-            status: 400,
-            headers: { "Content-Type": "application/json" },
-          }),
-        );
+        return jsonResponse({ error: "slow_down" }, 400);
       }
-      return Promise.resolve(
-        new Response(JSON.stringify({ access_token: "slowed_token", expires_in: 3600 }), {
-          status: 200,
-          headers: { "Content-Type": "application/json" },
-        }),
-      );
-    }) as unknown as typeof fetch;
-
-    try {
-      await loginDevice(SERVER_URL, CLIENT_ID);
-      const stored = await loadTokens();
-      expect(stored?.accessToken).toBe("slowed_token");
-    } finally {
-      global.fetch = originalFetch;
-    }
-  }, 15000);
-
-  it("access_denied → process.exit(1) with correct message", async () => {
-    const { loginDevice } = await import("../src/auth/oauth");
-
-    const originalFetch = global.fetch;
-    const originalExit = process.exit;
-    const stderrChunks: string[] = [];
-    const originalWrite = process.stderr.write.bind(process.stderr);
+      return jsonResponse({ access_token: "slowed_token", expires_in: 3600 });
+    });
 
-    process.stderr.write = (chunk: unknown) => {
-      stderrChunks.push(String(chunk));
-      return true;
-    };
+    await loginDevice(SERVER_URL, CLIENT_ID);
+    const stored = await loadTokens();
+    expect(stored?.accessToken).toBe("slowed_token");
+    expect(delays).toEqual([0, 5000]);
+  });
 
-    let exitCode: number | undefined;
-    process.exit = ((code: number) => {
-      exitCode = code;
-      throw new Error(`PROCESS_EXIT:${code}`);
-    }) as typeof process.exit;
-
-    global.fetch = vi.fn((url: string) => {
-      const u = String(url);
-      if (u.includes("/device/code")) {
-        return Promise.resolve(
-          new Response(
-            JSON.stringify({
-              device_code: "dc",
-              user_code: "A",
-              verification_uri: "https://x",
-              expires_in: 60,
-              interval: 0,
-            }),
-            { status: 200, headers: { "Content-Type": "application/json" } },
-          ),
-        );
-      }
-      return Promise.resolve(
-        new Response(JSON.stringify({ error: "access_denied" }), {
-          status: 400,
-          headers: { "Content-Type": "application/json" },
-        }),
-      );
-    }) as unknown as typeof fetch;
-
-    try {
-      await loginDevice(SERVER_URL, CLIENT_ID);
-    } catch (err) {
-      expect((err as Error).message).toContain("PROCESS_EXIT:1");
-    } finally {
-      global.fetch = originalFetch;
-      process.exit = originalExit;
-      process.stderr.write = originalWrite;
-    }
-
-    expect(exitCode).toBe(1);
-    expect(stderrChunks.join("")).toContain("Authorization denied");
+  it("access_denied → process.exit(1) with correct message", async () => {
+    const stderr = captureStderr();
+    const exit = throwOnExit();
+    vi.stubGlobal("fetch", (url: string) =>
+      String(url).includes("/device/code")
+        ? jsonResponse(DEVICE_CODE)
+        : jsonResponse({ error: "access_denied" }, 400),
+    );
+
+    await expect(loginDevice(SERVER_URL, CLIENT_ID)).rejects.toThrow("PROCESS_EXIT:1");
+    expect(exit).toHaveBeenCalledWith(1);
+    expect(stderr()).toContain("Authorization denied");
   });
 
   it("expired_token → process.exit(1) with re-run message", async () => {
-    const { loginDevice } = await import("../src/auth/oauth");
-
-    const originalFetch = global.fetch;
-    const originalExit = process.exit;
-    const stderrChunks: string[] = [];
-    const originalWrite = process.stderr.write.bind(process.stderr);
-
-    process.stderr.write = (chunk: unknown) => {
-      stderrChunks.push(String(chunk));
-      return true;
-    };
-
-    process.exit = ((code: number) => {
-      throw new Error(`PROCESS_EXIT:${code}`);
-    }) as typeof process.exit;
-
-    global.fetch = vi.fn((url: string) => {
-      const u = String(url);
-      if (u.includes("/device/code")) {
-        return Promise.resolve(
-          new Response(
-            JSON.stringify({
-              device_code: "dc",
-              user_code: "A",
-              verification_uri: "https://x",
-              expires_in: 60,
-              interval: 0,
-            }),
-            { status: 200, headers: { "Content-Type": "application/json" } },
-          ),
-        );
-      }
-      return Promise.resolve(
-        new Response(JSON.stringify({ error: "expired_token" }), {
-          status: 400,
-          headers: { "Content-Type": "application/json" },
-        }),
-      );
-    }) as unknown as typeof fetch;
-
-    try {
-      await loginDevice(SERVER_URL, CLIENT_ID);
-    } catch {
-      // expected exit
-    } finally {
-      global.fetch = originalFetch;
-      process.exit = originalExit;
-      process.stderr.write = originalWrite;
-    }
-
-    expect(stderrChunks.join("")).toContain("re-run");
-  }, 15000);
+    const stderr = captureStderr();
+    throwOnExit();
+    vi.stubGlobal("fetch", (url: string) =>
+      String(url).includes("/device/code")
+        ? jsonResponse(DEVICE_CODE)
+        : jsonResponse({ error: "expired_token" }, 400),
+    );
+
+    await expect(loginDevice(SERVER_URL, CLIENT_ID)).rejects.toThrow("PROCESS_EXIT:1");
+    expect(stderr()).toContain("re-run");
+  });
 
   it("unsupported_grant_type → process.exit(1) with --manual suggestion", async () => {
-    const { loginDevice } = await import("../src/auth/oauth");
-
-    const originalFetch = global.fetch;
-    const originalExit = process.exit;
-    const stderrChunks: string[] = [];
-    const originalWrite = process.stderr.write.bind(process.stderr);
-
-    process.stderr.write = (chunk: unknown) => {
-      stderrChunks.push(String(chunk));
-      return true;
-    };
-
-    process.exit = ((_code: number) => {
-      throw new Error("EXIT");
-    }) as typeof process.exit;
-
-    global.fetch = vi.fn((url: string) => {
-      const u = String(url);
-      if (u.includes("/device/code")) {
-        return Promise.resolve(
-          new Response(JSON.stringify({ error: "unsupported_grant_type" }), {
-            status: 400,
-            headers: { "Content-Type": "application/json" },
-          }),
-        );
-      }
-      return Promise.resolve(new Response("{}", { status: 200 }));
-    }) as unknown as typeof fetch;
-
-    try {
-      await loginDevice(SERVER_URL, CLIENT_ID);
-    } catch {
-      // expected exit
-    } finally {
-      global.fetch = originalFetch;
-      process.exit = originalExit;
-      process.stderr.write = originalWrite;
-    }
-
-    expect(stderrChunks.join("")).toContain("--manual");
+    const stderr = captureStderr();
+    throwOnExit();
+    vi.stubGlobal("fetch", (url: string) =>
+      String(url).includes("/device/code")
+        ? jsonResponse({ error: "unsupported_grant_type" }, 400)
+        : Promise.resolve(new Response("{}", { status: 200 })),
+    );
+
+    await expect(loginDevice(SERVER_URL, CLIENT_ID)).rejects.toThrow("PROCESS_EXIT:1");
+    expect(stderr()).toContain("--manual");
   });
 
   it("404 device code endpoint → process.exit(1) with --manual suggestion", async () => {
-    const { loginDevice } = await import("../src/auth/oauth");
-
-    const originalFetch = global.fetch;
-    const originalExit = process.exit;
-    const stderrChunks: string[] = [];
-    const originalWrite = process.stderr.write.bind(process.stderr);
+    const stderr = captureStderr();
+    throwOnExit();
+    vi.stubGlobal("fetch", () => Promise.resolve(new Response("Not Found", { status: 404 })));
 
-    process.stderr.write = (chunk: unknown) => {
-      stderrChunks.push(String(chunk));
-      return true;
-    };
-
-    process.exit = ((_code: number) => {
-      throw new Error("EXIT");
-    }) as typeof process.exit;
-
-    global.fetch = vi.fn(() =>
-      Promise.resolve(new Response("Not Found", { status: 404 })),
-    ) as unknown as typeof fetch;
-
-    try {
-      await loginDevice(SERVER_URL, CLIENT_ID);
-    } catch {
-      // expected exit
-    } finally {
-      global.fetch = originalFetch;
-      process.exit = originalExit;
-      process.stderr.write = originalWrite;
-    }
-
-    expect(stderrChunks.join("")).toContain("--manual");
+    await expect(loginDevice(SERVER_URL, CLIENT_ID)).rejects.toThrow("PROCESS_EXIT:1");
+    expect(stderr()).toContain("--manual");
   });
 });
 
@@ -498,36 +337,17 @@ describe("refreshAccessToken", () => {
   const SERVER_URL = "https://caipe.test";
 
   it("exchanges refresh token for new access token", async () => {
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(
-        new Response(JSON.stringify({ access_token: "refreshed", expires_in: 3600 }), {
-          status: 200,
-          headers: { "Content-Type": "application/json" },
-        }),
-      ),
-    ) as unknown as typeof fetch;
-
-    try {
-      const tokens = await refreshAccessToken("old_refresh", SERVER_URL);
-      expect(tokens.accessToken).toBe("refreshed");
-    } finally {
-      global.fetch = originalFetch;
-    }
+    vi.stubGlobal("fetch", () => jsonResponse({ access_token: "refreshed", expires_in: 3600 }));
+
+    const tokens = await refreshAccessToken("old_refresh", SERVER_URL);
+    expect(tokens.accessToken).toBe("refreshed");
   });
 
   it("throws AuthRequired on 400 response", async () => {
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(new Response("{}", { status: 400 })),
-    ) as unknown as typeof fetch;
-
-    try {
-      await expect(refreshAccessToken("bad_token", SERVER_URL)).rejects.toBeInstanceOf(
-        AuthRequired,
-      );
-    } finally {
-      global.fetch = originalFetch;
-    }
+    vi.stubGlobal("fetch", () => Promise.resolve(new Response("{}", { status: 400 })));
+
+    await expect(refreshAccessToken("bad_token", SERVER_URL)).rejects.toBeInstanceOf(
+      AuthRequired,
+    );
   });
 });
@@ -7,6 +7,7 @@ import { existsSync, mkdirSync, rmSync, writeFileSync } from "node:fs";
 import { tmpdir } from "node:os";
 import { join } from "node:path";
 import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
+import { fetchCatalog, verifyChecksum } from "../src/skills/catalog";
 
 let testDir: string;
 
@@ -17,6 +18,8 @@ beforeEach(() => {
 });
 
 afterEach(() => {
+  vi.restoreAllMocks();
+  vi.unstubAllGlobals();
   process.env.XDG_CONFIG_HOME = "";
   if (existsSync(testDir)) {
     rmSync(testDir, { recursive: true, force: true });
@@ -39,104 +42,82 @@ const MOCK_CATALOG = {
   ],
 };
 
+/** Network body for MOCK_CATALOG, serialized once for every fetch stub. */
+const MOCK_CATALOG_JSON = JSON.stringify(MOCK_CATALOG);
+
+/** Write MOCK_CATALOG to the on-disk cache as if fetched `ageMs` ago. */
+function primeCatalogCache(ageMs: number): void {
+  const configDir = join(testDir, "caipe");
+  mkdirSync(configDir, { recursive: true });
+  const cacheObj = {
+    catalog: MOCK_CATALOG,
+    cachedAt: new Date(Date.now() - ageMs).toISOString(),
+  };
+  writeFileSync(join(configDir, "catalog-cache.json"), JSON.stringify(cacheObj));
+}
+
 // ── fetchCatalog ─────────────────────────────────────────────────────────────
 
 describe("fetchCatalog", () => {
   it("fetches from network and caches result", async () => {
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
+    vi.stubGlobal("fetch", () =>
       Promise.resolve(
-        new Response(JSON.stringify(MOCK_CATALOG), {
+        new Response(MOCK_CATALOG_JSON, {
           status: 200,
           headers: { "Content-Type": "application/json" },
         }),
       ),
-    ) as unknown as typeof fetch;
-
-    try {
-      const { fetchCatalog } = await import("../src/skills/catalog");
-      const catalog = await fetchCatalog();
-      expect(catalog.skills).toHaveLength(1);
-      expect(catalog.skills[0]?.name).toBe("dco-ai-attribution");
-    } finally {
-      global.fetch = originalFetch;
-    }
+    );
+
+    const catalog = await fetchCatalog();
+    expect(catalog.skills).toHaveLength(1);
+    expect(catalog.skills[0]?.name).toBe("dco-ai-attribution");
   });
 
   it("returns stale cache when network fails", async () => {
-    // Prime the cache
-    const configDir = join(testDir, "caipe");
-    mkdirSync(configDir, { recursive: true });
-    const cacheObj = {
-      catalog: MOCK_CATALOG,
-      cachedAt: new Date(Date.now() - 2 * 60 * 60 * 1000).toISOString(),
-    }; // 2h old
-    writeFileSync(join(configDir, "catalog-cache.json"), JSON.stringify(cacheObj));
-
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.reject(new Error("Network error")),
-    ) as unknown as unknown as typeof fetch;
+    primeCatalogCache(2 * 60 * 60 * 1000); // 2h old
+
+    vi.stubGlobal("fetch", () => Promise.reject(new Error("Network error")));
 
     const stderrChunks: string[] = [];
-    const origWrite = process.stderr.write.bind(process.stderr);
-    process.stderr.write = (chunk: unknown) => {
+    vi.spyOn(process.stderr, "write").mockImplementation((chunk) => {
       stderrChunks.push(String(chunk));
       return true;
-    };
-
-    try {
-      const { fetchCatalog } = await import("../src/skills/catalog");
-      const catalog = await fetchCatalog();
-      expect(catalog.skills[0]?.name).toBe("dco-ai-attribution");
-      expect(stderrChunks.join("")).toContain("cached");
-    } finally {
-      global.fetch = originalFetch;
-      process.stderr.write = origWrite;
-    }
+    });
+
+    const catalog = await fetchCatalog();
+    expect(catalog.skills[0]?.name).toBe("dco-ai-attribution");
+    expect(stderrChunks.join("")).toContain("cached");
   });
 
   it("uses 1-hour TTL cache without network call", async () => {
-    // Prime fresh cache
-    const configDir = join(testDir, "caipe");
-    mkdirSync(configDir, { recursive: true });
-    const cacheObj = { catalog: MOCK_CATALOG, cachedAt: new Date().toISOString() };
-    writeFileSync(join(configDir, "catalog-cache.json"), JSON.stringify(cacheObj));
+    primeCatalogCache(0); // fresh
 
     let fetchCalled = false;
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() => {
+    vi.stubGlobal("fetch", () => {
       fetchCalled = true;
       return Promise.resolve(new Response("{}", { status: 200 }));
-    }) as unknown as typeof fetch;
-
-    try {
-      const { fetchCatalog } = await import("../src/skills/catalog");
-      await fetchCatalog();
-      expect(fetchCalled).toBe(false); // should use cache
-    } finally {
-      global.fetch = originalFetch;
-    }
+    });
+
+    await fetchCatalog();
+    expect(fetchCalled).toBe(false); // should use cache
   });
 });
 
 // ── verifyChecksum ────────────────────────────────────────────────────────────
 
 describe("verifyChecksum", () => {
-  it("passes for matching checksum", async () => {
+  it("passes for matching checksum", () => {
     const content = "# Test skill content";
     const hash = createHash("sha256").update(content, "utf8").digest("hex");
-    const { verifyChecksum } = await import("../src/skills/catalog");
     expect(() => verifyChecksum(content, `sha256:${hash}`)).not.toThrow();
   });
 
-  it("throws for mismatched checksum", async () => {
-    const { verifyChecksum } = await import("../src/skills/catalog");
+  it("throws for mismatched checksum", () => {
     expect(() => verifyChecksum("wrong content", "sha256:abc123")).toThrow(/Checksum mismatch/);
   });
 
-  it("throws for unknown checksum format", async () => {
-    const { verifyChecksum } = await import("../src/skills/catalog");
+  it("throws for unknown checksum format", () => {
     expect(() => verifyChecksum("content", "md5:abc")).toThrow(/Unknown checksum format/);
   });
 });
@@ -8,7 +8,9 @@
  * without launching a full server.
  */
 
-import { describe, expect, it } from "vitest";
+import { afterEach, describe, expect, it, vi } from "vitest";
+import { DEFAULT_AGENT } from "../src/agents/types";
+import { createAdapter } from "../src/chat/stream";
 import { ServerNotConfigured } from "../src/platform/config";
 
 // ── ServerNotConfigured error contract ────────────────────────────────────────
@@ -25,7 +27,7 @@ describe("ServerNotConfigured", () => {
 // ── config get --json output shape ────────────────────────────────────────────
 
 describe("config get JSON shape", () => {
-  it("matches schema: { key, value, source }", async () => {
+  it("matches schema: { key, value, source }", () => {
     // We simulate what runConfigGet would produce by constructing the shape
     const shape = { key: "server.url", value: "https://example.com", source: "settings.json" };
     expect(shape).toMatchObject({
@@ -105,10 +107,11 @@ describe("headless output shape contracts", () => {
 // ── StreamAdapter interface contract ─────────────────────────────────────────
 
 describe("StreamAdapter contract", () => {
-  it("createAdapter returns object with connect() method", async () => {
-    const { createAdapter } = await import("../src/chat/stream");
-    const { DEFAULT_AGENT } = await import("../src/agents/types");
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
 
+  it("createAdapter returns object with connect() method", () => {
     const adapter = createAdapter(
       DEFAULT_AGENT,
       "https://caipe.test/api/v1/chat/stream/start",
@@ -117,13 +120,9 @@ describe("StreamAdapter contract", () => {
     expect(typeof adapter.connect).toBe("function");
   });
 
-  it("connect returns AsyncIterable", async () => {
-    const { createAdapter } = await import("../src/chat/stream");
-    const { DEFAULT_AGENT } = await import("../src/agents/types");
-
+  it("connect returns AsyncIterable", () => {
     // Mock fetch to return an empty SSE stream
-    const originalFetch = global.fetch;
-    global.fetch = (() =>
+    vi.stubGlobal("fetch", () =>
       Promise.resolve(
         new Response(
           new ReadableStream({
@@ -136,35 +135,30 @@ describe("StreamAdapter contract", () => {
             headers: { "Content-Type": "text/event-stream" },
           },
         ),
-      )) as unknown as typeof fetch;
-
-    try {
-      const adapter = createAdapter(
-        DEFAULT_AGENT,
-        "https://caipe.test/api/v1/chat/stream/start",
-        async () => "tok",
-      );
-      const iter = adapter.connect({
-        prompt: "test",
-        systemContext: "",
-        sessionId: "s1",
-        agentName: "default",
-      });
-
-      // Should be async iterable
-      expect(Symbol.asyncIterator in iter).toBe(true);
-    } finally {
-      global.fetch = originalFetch;
-    }
-  });
-});
+      ),
+    );
 
-// ── Exit code constants ───────────────────────────────────────────────────────
+    const adapter = createAdapter(
+      DEFAULT_AGENT,
+      "https://caipe.test/api/v1/chat/stream/start",
+      async () => "tok",
+    );
+    const iter = adapter.connect({
+      prompt: "test",
+      systemContext: "",
+      sessionId: "s1",
+      agentName: "default",
+    });
 
-describe("exit code semantics", () => {
-  it("exit 0 = success", () => expect(0).toBe(0));
-  it("exit 1 = auth failure", () => expect(1).toBe(1));
-  it("exit 2 = network error", () => expect(2).toBe(2));
-  it("exit 3 = user-facing validation error", () => expect(3).toBe(3));
-  it("exit 4 = internal error", () => expect(4).toBe(4));
+    // Should be async iterable
+    expect(Symbol.asyncIterator in iter).toBe(true);
+  });
 });
+
+// ── Exit code semantics ───────────────────────────────────────────────────────
+//
+// 0 = success, 1 = auth failure, 2 = network error,
+// 3 = user-facing validation error, 4 = internal error.
+// These are process.exit() literals at each call site, not constants, so they are
+// asserted on real CLI runs in tests/cli.e2e.test.ts ("exit codes"): 1 for an
+// unknown subcommand and for a missing server config, 3 for an unsupported key.
@@ -1,11 +1,15 @@
 /**
  * E2E: CLI entrypoints (Node/tsx — not raw Bun binaries on PATH).
+ *
+ * Each case cold-starts a Node + tsx process; they share no state, so run them concurrently.
  */
 
+import { mkdtempSync, rmSync } from "node:fs";
+import { tmpdir } from "node:os";
 import { dirname, join } from "node:path";
 import { fileURLToPath } from "node:url";
 import { execa } from "execa";
-import { describe, expect, it } from "vitest";
+import { afterAll, describe, expect, it } from "vitest";
 
 const root = join(dirname(fileURLToPath(import.meta.url)), "..");
 const launcher = join(root, "bin/caipe.cjs");
@@ -17,32 +21,39 @@ const nodeEnv = {
   CAIPE_CLI_ROOT: root,
 };
 
-describe("bin/caipe.cjs", () => {
+interface RunOptions {
+  reject?: boolean;
+  /** Working directory; defaults to the checkout root. */
+  cwd?: string;
+  /** Extra variables layered over the shared checkout env. */
+  env?: Record<string, string>;
+}
+
+/** Run a bin/ script under the current Node with the shared checkout env. */
+function runScript(script: string, args: string[] = [], { env, ...options }: RunOptions = {}) {
+  return execa(process.execPath, [script, ...args], {
+    cwd: root,
+    ...options,
+    env: { ...nodeEnv, ...env },
+  });
+}
+
+describe.concurrent("bin/caipe.cjs", () => {
   it("prints version via Node/tsx", async () => {
-    const { stdout, exitCode } = await execa(process.execPath, [launcher, "--version"], {
-      cwd: root,
-      env: nodeEnv,
-    });
+    const { stdout, exitCode } = await runScript(launcher, ["--version"]);
     expect(exitCode).toBe(0);
     expect(stdout.trim()).toMatch(/^\d+\.\d+\.\d+/);
   });
 
   it("default action in non-TTY exits without SIGKILL", async () => {
-    const r = await execa(process.execPath, [launcher], {
-      cwd: root,
-      env: nodeEnv,
-      reject: false,
-    });
+    const r = await runScript(launcher, [], { reject: false });
     expect(r.signal).not.toBe("SIGKILL");
     expect(r.exitCode).not.toBe(137);
     expect(r.stderr || r.stdout).toMatch(/credentials|headless|ERROR/i);
   });
 
   it("prints top-level help", async () => {
-    const { stdout, exitCode } = await execa(process.execPath, [launcher, "--help"], {
-      cwd: root,
-      env: nodeEnv,
-    });
+    const { stdout, exitCode } = await runScript(launcher, ["--help"]);
     expect(exitCode).toBe(0);
     expect(stdout).toMatch(/chat|config|auth/i);
   });
@@ -50,10 +61,43 @@ describe("bin/caipe.cjs", () => {
 
 describe("bin/caipe-path.cjs", () => {
   it("delegates to the checkout when CAIPE_CLI_ROOT is set", async () => {
-    const { stdout, exitCode } = await execa(process.execPath, [pathStub, "--version"], {
-      env: { ...nodeEnv, CAIPE_CLI_ROOT: root },
-    });
+    // Run from outside the checkout so only CAIPE_CLI_ROOT can locate it.
+    const { stdout, exitCode } = await runScript(pathStub, ["--version"], { cwd: tmpdir() });
     expect(exitCode).toBe(0);
     expect(stdout.trim()).toMatch(/^\d+\.\d+\.\d+/);
   });
 });
+
+describe.concurrent("exit codes", () => {
+  // Empty config dir and no URL env vars: nothing is configured.
+  const configHome = mkdtempSync(join(tmpdir(), "caipe-e2e-"));
+  const unconfigured = { XDG_CONFIG_HOME: configHome, CAIPE_AUTH_URL: "", CAIPE_SERVER_URL: "" };
+
+  afterAll(() => {
+    rmSync(configHome, { recursive: true, force: true });
+  });
+
+  it("exits 1 on an unknown subcommand", async () => {
+    const r = await runScript(launcher, ["config", "bogus"], { reject: false, env: unconfigured });
+    expect(r.exitCode).toBe(1);
+    expect(r.stderr).toMatch(/unknown command/i);
+  });
+
+  it("exits 1 when no server is configured", async () => {
+    const r = await runScript(launcher, ["chat", "--prompt", "hi"], {
+      reject: false,
+      env: unconfigured,
+    });
+    expect(r.exitCode).toBe(1);
+    expect(r.stderr).toMatch(/No CAIPE auth URL configured/);
+  });
+
+  it("exits 3 on an unsupported config key", async () => {
+    const r = await runScript(launcher, ["config", "set", "bogus.key", "x"], {
+      reject: false,
+      env: unconfigured,
+    });
+    expect(r.exitCode).toBe(3);
+    expect(r.stderr).toMatch(/Unknown config key/);
+  });
+});
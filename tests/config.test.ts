@@ -9,9 +9,9 @@
  *   - authEndpoints helper
  */
 
-import { existsSync, mkdirSync, rmSync } from "node:fs";
+import { existsSync, mkdirSync, rmSync, writeFileSync } from "node:fs";
 import { tmpdir } from "node:os";
-import { join } from "node:path";
+import { dirname, join } from "node:path";
 import { afterEach, beforeEach, describe, expect, it } from "vitest";
 
 // We need to control the home directory to avoid writing to actual ~/.config/caipe
@@ -44,6 +44,8 @@ afterEach(() => {
 
 import {
   ServerNotConfigured,
+  type Settings,
+  authEndpoints,
   getAuthUrl,
   getServerUrl,
   globalConfigDir,
@@ -69,27 +71,17 @@ describe("settings read/write", () => {
     expect(s).toEqual({});
   });
 
-  it("round-trips settings", () => {
-    writeSettings({ server: { url: "https://caipe.example.com" } });
-    const s = readSettings();
-    expect(s.server?.url).toBe("https://caipe.example.com");
-  });
-
-  it("round-trips apiKey", () => {
-    writeSettings({ auth: { apiKey: "secret" } });
-    const s = readSettings();
-    expect(s.auth?.apiKey).toBe("secret");
-  });
-
-  it("round-trips agent.default", () => {
-    writeSettings({ agent: { default: "agent-sre" } });
-    const s = readSettings();
-    expect(s.agent?.default).toBe("agent-sre");
+  it.each<[string, Settings]>([
+    ["server.url", { server: { url: "https://caipe.example.com" } }],
+    ["auth.apiKey", { auth: { apiKey: "secret" } }],
+    ["agent.default", { agent: { default: "agent-sre" } }],
+  ])("round-trips %s", (_field, settings) => {
+    writeSettings(settings);
+    expect(readSettings()).toMatchObject(settings);
   });
 
   it("handles corrupted settings file gracefully", () => {
-    const { writeFileSync, mkdirSync } = require("node:fs") as typeof import("fs");
-    mkdirSync(require("node:path").dirname(settingsJsonPath()), { recursive: true });
+    mkdirSync(dirname(settingsJsonPath()), { recursive: true });
     writeFileSync(settingsJsonPath(), "not json");
     const s = readSettings();
     expect(s).toEqual({});
@@ -175,13 +167,15 @@ describe("getServerUrl (deprecated alias for getAuthUrl)", () => {
 // ── endpoint helpers ──────────────────────────────────────────────────────────
 
 describe("authEndpoints", () => {
-  it("derives all auth/OAuth endpoints correctly", async () => {
-    const { authEndpoints } = await import("../src/platform/config");
-    const ep = authEndpoints("https://caipe.example.com");
-    expect(ep.deviceCode).toBe("https://caipe.example.com/oauth/device/code");
-    expect(ep.token).toBe("https://caipe.example.com/oauth/token");
-    expect(ep.agents).toBe("https://caipe.example.com/api/v1/agents");
-    expect(ep.agentCard).toBe("https://caipe.example.com/.well-known/agent.json");
-    expect(ep.streamStart).toBe("https://caipe.example.com/api/v1/chat/stream/start");
+  it("derives all auth/OAuth endpoints correctly", () => {
+    expect(authEndpoints("https://caipe.example.com")).toEqual({
+      oauthBase: "https://caipe.example.com/oauth",
+      deviceCode: "https://caipe.example.com/oauth/device/code",
+      token: "https://caipe.example.com/oauth/token",
+      agentCard: "https://caipe.example.com/.well-known/agent.json",
+      agents: "https://caipe.example.com/api/user/accessible-agents",
+      streamStart: "https://caipe.example.com/api/v1/chat/stream/start",
+      skills: "https://caipe.example.com/api/skills",
+    });
   });
 });
@@ -6,6 +6,11 @@ import { existsSync, mkdirSync, rmSync, writeFileSync } from "node:fs";
 import { tmpdir } from "node:os";
 import { join } from "node:path";
 import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
+import { buildSystemContext, formatClientDateContext } from "../src/chat/context";
+import { buildMemoryContext, loadMemoryFiles } from "../src/memory/loader";
+
+/** Memory body just over the 50k-token budget (50k tokens × 4 chars/token = 200k chars). */
+const OVER_BUDGET_MEMORY = "x".repeat(201_000);
 
 let testDir: string;
 
@@ -25,47 +30,43 @@ afterEach(() => {
 // ── Memory file loading ───────────────────────────────────────────────────────
 
 describe("loadMemoryFiles", () => {
-  it("returns empty array when no memory files exist", async () => {
-    const { loadMemoryFiles } = await import("../src/memory/loader");
+  it("returns empty array when no memory files exist", () => {
     const files = loadMemoryFiles(testDir);
     expect(files).toHaveLength(0);
   });
 
-  it("loads global CLAUDE.md when it exists", async () => {
+  it("loads global CLAUDE.md when it exists", () => {
     // Create caipe config dir with global CLAUDE.md
     const configDir = join(testDir, "caipe");
     mkdirSync(configDir, { recursive: true });
     writeFileSync(join(configDir, "CLAUDE.md"), "# Global memory\nHello world.");
 
-    const { loadMemoryFiles } = await import("../src/memory/loader");
     const files = loadMemoryFiles(testDir);
     const global_ = files.find((f) => f.scope === "global");
     expect(global_).toBeDefined();
     expect(global_?.content).toContain("Hello world.");
   });
 
-  it("loads project CLAUDE.md when .claude/ exists with .git", async () => {
+  it("loads project CLAUDE.md when .claude/ exists with .git", () => {
     // Create a fake git repo structure
     const projectDir = join(testDir, "project");
     mkdirSync(join(projectDir, ".git"), { recursive: true });
     mkdirSync(join(projectDir, ".claude", "memory"), { recursive: true });
     writeFileSync(join(projectDir, ".claude", "CLAUDE.md"), "# Project memory\nBye world.");
 
-    const { loadMemoryFiles } = await import("../src/memory/loader");
     const files = loadMemoryFiles(projectDir);
     const project = files.find((f) => f.scope === "project");
     expect(project).toBeDefined();
     expect(project?.content).toContain("Bye world.");
   });
 
-  it("loads managed memory files in alphabetical order", async () => {
+  it("loads managed memory files in alphabetical order", () => {
     const projectDir = join(testDir, "project2");
     mkdirSync(join(projectDir, ".git"), { recursive: true });
     mkdirSync(join(projectDir, ".claude", "memory"), { recursive: true });
     writeFileSync(join(projectDir, ".claude", "memory", "b_file.md"), "BBB");
     writeFileSync(join(projectDir, ".claude", "memory", "a_file.md"), "AAA");
 
-    const { loadMemoryFiles } = await import("../src/memory/loader");
     const files = loadMemoryFiles(projectDir);
     const managed = files.filter((f) => f.scope === "managed");
     expect(managed).toHaveLength(2);
@@ -73,12 +74,10 @@ describe("loadMemoryFiles", () => {
     expect(managed[1]?.content).toBe("BBB");
   });
 
-  it("emits warning to stderr and truncates at 50k token budget", async () => {
+  it("emits warning to stderr and truncates at 50k token budget", () => {
     const configDir = join(testDir, "caipe");
     mkdirSync(configDir, { recursive: true });
-    // 50k tokens × 4 chars/token = 200k chars; write 201k chars
-    const bigContent = "x".repeat(201_000);
-    writeFileSync(join(configDir, "CLAUDE.md"), bigContent);
+    writeFileSync(join(configDir, "CLAUDE.md"), OVER_BUDGET_MEMORY);
 
     const stderrChunks: string[] = [];
     const originalWrite = process.stderr.write.bind(process.stderr);
@@ -87,7 +86,6 @@ describe("loadMemoryFiles", () => {
       return true;
     };
 
-    const { loadMemoryFiles } = await import("../src/memory/loader");
     const files = loadMemoryFiles(testDir);
 
     process.stderr.write = originalWrite;
@@ -102,13 +100,11 @@ describe("loadMemoryFiles", () => {
 // ── buildMemoryContext ────────────────────────────────────────────────────────
 
 describe("buildMemoryContext", () => {
-  it("returns empty string for empty array", async () => {
-    const { buildMemoryContext } = await import("../src/memory/loader");
+  it("returns empty string for empty array", () => {
     expect(buildMemoryContext([])).toBe("");
   });
 
-  it("joins files with scope comment headers", async () => {
-    const { buildMemoryContext } = await import("../src/memory/loader");
+  it("joins files with scope comment headers", () => {
     const ctx = buildMemoryContext([
       { path: "/a/CLAUDE.md", scope: "global", content: "AAA", tokenEstimate: 1 },
       { path: "/b/CLAUDE.md", scope: "project", content: "BBB", tokenEstimate: 1 },
@@ -123,8 +119,7 @@ describe("buildMemoryContext", () => {
 // ── buildSystemContext ────────────────────────────────────────────────────────
 
 describe("formatClientDateContext", () => {
-  it("includes local date and timezone", async () => {
-    const { formatClientDateContext } = await import("../src/chat/context");
+  it("includes local date and timezone", () => {
     const block = formatClientDateContext(new Date("2026-07-24T15:00:00.000Z"));
     expect(block).toContain("<client-context>");
     expect(block).toContain("2026-07-24");
@@ -138,7 +133,6 @@ describe("buildSystemContext", () => {
     mkdirSync(configDir, { recursive: true });
     writeFileSync(join(configDir, "CLAUDE.md"), "Memory content.");
 
-    const { buildSystemContext } = await import("../src/chat/context");
     const ctx = await buildSystemContext(testDir, true);
     expect(ctx).toContain("<client-context>");
     expect(ctx).toContain("Memory content.");
@@ -155,8 +149,8 @@ describe("buildSystemContext", () => {
       recentLog: async () => "abc1234 Initial commit",
     }));
 
-    const { buildSystemContext } = await import("../src/chat/context");
-    const ctx = await buildSystemContext(testDir, false);
+    const { buildSystemContext: buildWithMockedGit } = await import("../src/chat/context");
+    const ctx = await buildWithMockedGit(testDir, false);
     vi.doUnmock("../src/platform/git");
     expect(ctx).toContain("<repository>");
     expect(ctx).toContain("src/index.ts");
@@ -8,8 +8,13 @@ describe("isUnifiedDiffText", () => {
     process.env = { ...envBackup };
   });
 
-  it("detects unified diff headers", () => {
-    const raw = "--- a\n+++ b\n-old\n+new";
-    expect(isUnifiedDiffText(raw)).toBe(true);
+  it.each<[string, string, boolean]>([
+    ["unified diff headers", "--- a\n+++ b\n-old\n+new", true],
+    ["a bare hunk with change lines", "@@ -1 +1 @@\n-old\n+new", true],
+    ["a markdown list", "Some text\n- a bullet\n+ another", false],
+    ["a horizontal rule without +++", "--- \nA horizontal rule above, no +++ header", false],
+    ["an @@ mention without change lines", "@@ mention without any change lines", false],
+  ])("%s → %s", (_case, raw, expected) => {
+    expect(isUnifiedDiffText(raw)).toBe(expected);
   });
 });
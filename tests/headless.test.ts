@@ -6,6 +6,9 @@ import { existsSync, mkdirSync, rmSync } from "node:fs";
 import { tmpdir } from "node:os";
 import { join } from "node:path";
 import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
+import { resolveHeadlessCredentials } from "../src/headless/auth";
+import { createOutputWriter } from "../src/headless/output";
+import { writeSettings } from "../src/platform/config";
 
 let testDir: string;
 
@@ -21,6 +24,8 @@ beforeEach(() => {
 });
 
 afterEach(() => {
+  vi.restoreAllMocks();
+  vi.unstubAllGlobals();
   process.env.XDG_CONFIG_HOME = "";
   process.env.CAIPE_TOKEN = "";
   process.env.CAIPE_API_KEY = "";
@@ -35,41 +40,39 @@ afterEach(() => {
 
 describe("resolveHeadlessCredentials", () => {
   it("returns null when no credentials are set", async () => {
-    const { resolveHeadlessCredentials } = await import("../src/headless/auth");
     const creds = await resolveHeadlessCredentials();
     expect(creds).toBeNull();
   });
 
-  it("returns jwt type for CAIPE_TOKEN env", async () => {
-    process.env.CAIPE_TOKEN = "my-jwt-token";
-    const { resolveHeadlessCredentials } = await import("../src/headless/auth");
-    const creds = await resolveHeadlessCredentials();
-    expect(creds?.type).toBe("jwt");
-    expect(creds?.accessToken).toBe("my-jwt-token");
-  });
-
-  it("--token flag takes priority over CAIPE_TOKEN env", async () => {
-    process.env.CAIPE_TOKEN = "env-token";
-    const { resolveHeadlessCredentials } = await import("../src/headless/auth");
-    const creds = await resolveHeadlessCredentials("flag-token");
-    expect(creds?.accessToken).toBe("flag-token");
-  });
-
-  it("returns apikey type for CAIPE_API_KEY env", async () => {
-    process.env.CAIPE_API_KEY = "my-api-key";
-    const { resolveHeadlessCredentials } = await import("../src/headless/auth");
-    const creds = await resolveHeadlessCredentials();
-    expect(creds?.type).toBe("apikey");
-    expect(creds?.accessToken).toBe("my-api-key");
-  });
-
-  it("JWT takes priority over API key", async () => {
-    process.env.CAIPE_TOKEN = "jwt-wins";
-    process.env.CAIPE_API_KEY = "api-loses";
-    const { resolveHeadlessCredentials } = await import("../src/headless/auth");
-    const creds = await resolveHeadlessCredentials();
-    expect(creds?.type).toBe("jwt");
-    expect(creds?.accessToken).toBe("jwt-wins");
+  it.each([
+    {
+      name: "returns jwt type for CAIPE_TOKEN env",
+      env: { CAIPE_TOKEN: "my-jwt-token" },
+      flag: undefined,
+      expected: { type: "jwt", accessToken: "my-jwt-token" },
+    },
+    {
+      name: "--token flag takes priority over CAIPE_TOKEN env",
+      env: { CAIPE_TOKEN: "env-token" },
+      flag: "flag-token",
+      expected: { type: "jwt", accessToken: "flag-token" },
+    },
+    {
+      name: "returns apikey type for CAIPE_API_KEY env",
+      env: { CAIPE_API_KEY: "my-api-key" },
+      flag: undefined,
+      expected: { type: "apikey", accessToken: "my-api-key" },
+    },
+    {
+      name: "JWT takes priority over API key",
+      env: { CAIPE_TOKEN: "jwt-wins", CAIPE_API_KEY: "api-loses" },
+      flag: undefined,
+      expected: { type: "jwt", accessToken: "jwt-wins" },
+    },
+  ])("$name", async ({ env, flag, expected }) => {
+    Object.assign(process.env, env);
+    const creds = await resolveHeadlessCredentials(flag);
+    expect(creds).toMatchObject(expected);
   });
 
   it("client_credentials exchange when CAIPE_CLIENT_ID + SECRET set", async () => {
@@ -79,66 +82,55 @@ describe("resolveHeadlessCredentials", () => {
     // We need a server URL for the token exchange
     const configDir = join(testDir, "caipe");
     mkdirSync(configDir, { recursive: true });
-    const { writeSettings } = await import("../src/platform/config");
     writeSettings({ server: { url: "https://caipe.test" } });
 
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
+    vi.stubGlobal("fetch", () =>
       Promise.resolve(
         new Response(JSON.stringify({ access_token: "cc-token", expires_in: 3600 }), {
           status: 200,
           headers: { "Content-Type": "application/json" },
         }),
       ),
-    ) as unknown as typeof fetch;
-
-    try {
-      const { resolveHeadlessCredentials } = await import("../src/headless/auth");
-      const creds = await resolveHeadlessCredentials(undefined, "https://caipe.test");
-      expect(creds?.type).toBe("client_credentials");
-      expect(creds?.accessToken).toBe("cc-token");
-    } finally {
-      global.fetch = originalFetch;
-    }
+    );
+
+    const creds = await resolveHeadlessCredentials(undefined, "https://caipe.test");
+    expect(creds?.type).toBe("client_credentials");
+    expect(creds?.accessToken).toBe("cc-token");
   });
 });
 
 // ── OutputWriter ─────────────────────────────────────────────────────────────
 
+// Collect everything written to a stream; the spy is undone by vi.restoreAllMocks().
+const captureWrites = (stream: NodeJS.WriteStream): string[] => {
+  const chunks: string[] = [];
+  vi.spyOn(stream, "write").mockImplementation((chunk) => {
+    chunks.push(String(chunk));
+    return true;
+  });
+  return chunks;
+};
+
 describe("createOutputWriter", () => {
-  it("text format streams raw token text", async () => {
-    const { createOutputWriter } = await import("../src/headless/output");
-    const chunks: string[] = [];
-    const origWrite = process.stdout.write.bind(process.stdout);
-    process.stdout.write = (chunk: unknown) => {
-      chunks.push(String(chunk));
-      return true;
-    };
+  it("text format streams raw token text", () => {
+    const chunks = captureWrites(process.stdout);
 
     const writer = createOutputWriter("text");
     writer.write({ type: "token", text: "Hello " });
     writer.write({ type: "token", text: "world" });
     writer.flush("default");
 
-    process.stdout.write = origWrite;
     expect(chunks.join("")).toContain("Hello world");
   });
 
-  it("json format emits single blob on flush", async () => {
-    const { createOutputWriter } = await import("../src/headless/output");
-    const chunks: string[] = [];
-    const origWrite = process.stdout.write.bind(process.stdout);
-    process.stdout.write = (chunk: unknown) => {
-      chunks.push(String(chunk));
-      return true;
-    };
+  it("json format emits single blob on flush", () => {
+    const chunks = captureWrites(process.stdout);
 
     const writer = createOutputWriter("json");
     writer.write({ type: "token", text: "Hello " });
     writer.write({ type: "token", text: "world" });
     writer.flush("argocd");
 
-    process.stdout.write = origWrite;
     const output = chunks.join("");
     const parsed = JSON.parse(output);
     expect(parsed.response).toBe("Hello world");
@@ -146,42 +138,27 @@ describe("createOutputWriter", () => {
     expect(parsed.protocol).toBe("agui");
   });
 
-  it("ndjson format emits per-event JSON lines", async () => {
-    const { createOutputWriter } = await import("../src/headless/output");
-    const chunks: string[] = [];
-    const origWrite = process.stdout.write.bind(process.stdout);
-    process.stdout.write = (chunk: unknown) => {
-      chunks.push(String(chunk));
-      return true;
-    };
+  it("ndjson format emits per-event JSON lines", () => {
+    const chunks = captureWrites(process.stdout);
 
     const writer = createOutputWriter("ndjson");
     writer.write({ type: "token", text: "tok1" });
     writer.write({ type: "done" });
     writer.flush("default");
 
-    process.stdout.write = origWrite;
     const lines = chunks.join("").trim().split("\n").filter(Boolean);
     expect(lines).toHaveLength(2);
     expect(JSON.parse(lines[0]!)).toEqual({ type: "token", text: "tok1" });
     expect(JSON.parse(lines[1]!)).toEqual({ type: "done" });
   });
 
-  it("error events go to stderr as JSON regardless of format", async () => {
-    const { createOutputWriter } = await import("../src/headless/output");
-
+  it("error events go to stderr as JSON regardless of format", () => {
+    const errChunks = captureWrites(process.stderr);
     for (const fmt of ["text", "json", "ndjson"] as const) {
-      const errChunks: string[] = [];
-      const origErrWrite = process.stderr.write.bind(process.stderr);
-      process.stderr.write = (chunk: unknown) => {
-        errChunks.push(String(chunk));
-        return true;
-      };
-
+      errChunks.length = 0;
       const writer = createOutputWriter(fmt);
       writer.write({ type: "error", message: "Something failed" });
 
-      process.stderr.write = origErrWrite;
       const errOut = errChunks.join("");
       const parsed = JSON.parse(errOut);
       expect(parsed.error).toBe("Something failed");
@@ -2,26 +2,42 @@
  * Session file persistence (conversation id + resume fields).
  */
 
-import { existsSync, rmSync } from "node:fs";
+import { existsSync, readFileSync, rmSync, writeFileSync } from "node:fs";
 import { join } from "node:path";
-import { afterEach, describe, expect, it, vi } from "vitest";
+import { afterEach, beforeEach, describe, expect, it } from "vitest";
 import {
+  type Message,
   createSession,
   filterSessions,
+  listSessions,
   loadSession,
   patchSessionConversationId,
   resolveSessionIdByArg,
   saveSession,
 } from "../src/chat/history";
+import { readStringSpan, scanTopLevelFields } from "../src/chat/json-scan";
+import { sessionsDir } from "../src/platform/config";
 
 const TEST_HOME = join(process.cwd(), ".test-sessions-home");
 
-vi.mock("../src/platform/config.js", () => ({
-  sessionsDir: () => join(TEST_HOME, "sessions"),
-}));
+// Persistence tests only care about message shape and count, not timing.
+const MESSAGE_TIMESTAMP = "2026-01-01T00:00:00.000Z";
+
+const userMessage = (content: string, agentName = "default"): Message => ({
+  role: "user",
+  content,
+  timestamp: MESSAGE_TIMESTAMP,
+  agentName,
+  tokenCount: null,
+});
 
 describe("session persistence", () => {
+  beforeEach(() => {
+    process.env.XDG_CONFIG_HOME = TEST_HOME;
+  });
+
   afterEach(() => {
+    process.env.XDG_CONFIG_HOME = "";
     if (existsSync(TEST_HOME)) rmSync(TEST_HOME, { recursive: true, force: true });
   });
 
@@ -31,13 +47,7 @@ describe("session persistence", () => {
       workingDir: "/tmp",
       conversationId: "server-conv-abc",
     });
-    session.messages.push({
-      role: "user",
-      content: "hi",
-      timestamp: new Date().toISOString(),
-      agentName: "default",
-      tokenCount: null,
-    });
+    session.messages.push(userMessage("hi"));
     saveSession(session);
     const loaded = loadSession(session.sessionId);
     expect(loaded?.conversationId).toBe("server-conv-abc");
@@ -52,6 +62,34 @@ describe("session persistence", () => {
     expect(loaded?.conversationId).toBe("new-id");
   });
 
+  it("saveSession writes conversationId ahead of the message history", () => {
+    const session = createSession({ agentName: "default", workingDir: "/tmp" });
+    session.messages.push(userMessage("hi"));
+    // Same shape the REPL persists: the id is assigned after the history.
+    saveSession({ ...session, messages: session.messages, conversationId: "conv-1" });
+    const raw = readFileSync(join(sessionsDir(), `${session.sessionId}.json`), "utf8");
+
+    // The scan finds the id without reaching the messages.
+    const head = raw.slice(0, raw.indexOf('"messages"'));
+    const span = scanTopLevelFields(head, ["conversationId"]).get("conversationId");
+    expect(readStringSpan(head, span)).toBe("conv-1");
+  });
+
+  it("patchSessionConversationId does not rewrite the file when the id is unchanged", () => {
+    const session = createSession({
+      agentName: "default",
+      workingDir: "/tmp",
+      conversationId: "same-id",
+    });
+    saveSession(session);
+    const path = join(sessionsDir(), `${session.sessionId}.json`);
+    const compact = JSON.stringify(session);
+    writeFileSync(path, compact);
+
+    patchSessionConversationId(session.sessionId, "same-id");
+    expect(readFileSync(path, "utf8")).toBe(compact);
+  });
+
   it("resolveSessionIdByArg matches full id and unique prefix", () => {
     const a = createSession({ agentName: "a", workingDir: "/tmp" });
     const b = createSession({ agentName: "b", workingDir: "/tmp" });
@@ -87,4 +125,24 @@ describe("session persistence", () => {
     expect(filterSessions(sessions, "def")).toHaveLength(1);
     expect(filterSessions(sessions, "")).toHaveLength(2);
   });
+
+  it("listSessions summarises saved files and skips truncated ones", () => {
+    const session = createSession({ agentName: "agent-sre", workingDir: "/tmp" });
+    session.messages.push(
+      userMessage("one", "agent-sre"),
+      userMessage('two with "quotes" and ] brackets', "agent-sre"),
+    );
+    saveSession(session);
+    writeFileSync(join(sessionsDir(), "broken.json"), '{"sessionId": "broken", "messa');
+
+    expect(listSessions()).toEqual([
+      {
+        sessionId: session.sessionId,
+        agentName: "agent-sre",
+        protocol: "agui",
+        startedAt: session.startedAt,
+        messageCount: 2,
+      },
+    ]);
+  });
 });
@@ -0,0 +1,51 @@
+import { describe, expect, it } from "vitest";
+import { readStringSpan, scanTopLevelFields } from "../src/chat/json-scan.js";
+
+describe("scanTopLevelFields", () => {
+  it("finds top-level string values without descending into nested objects", () => {
+    const json = JSON.stringify({ meta: { command: "nested" }, command: "ls -la", n: 3 });
+    const fields = scanTopLevelFields(json, ["command", "n", "cwd"]);
+    expect(readStringSpan(json, fields.get("command"))).toBe("ls -la");
+    const n = fields.get("n");
+    expect(n && json.slice(n.start, n.end)).toBe("3");
+  });
+
+  it("skips escaped quotes and braces inside strings", () => {
+    const json = JSON.stringify({ content: 'say "}" and {', cmd: 'echo "hi"' });
+    const fields = scanTopLevelFields(json, ["cmd"]);
+    expect(readStringSpan(json, fields.get("cmd"))).toBe('echo "hi"');
+  });
+
+  it("treats a quote after an even run of backslashes as closing the string", () => {
+    const json = JSON.stringify({ path: "C:\\dir\\", note: '\\"x', cmd: "ok" });
+    const fields = scanTopLevelFields(json, ["path", "note", "cmd"]);
+    expect(readStringSpan(json, fields.get("path"))).toBe("C:\\dir\\");
+    expect(readStringSpan(json, fields.get("note"))).toBe('\\"x');
+    expect(readStringSpan(json, fields.get("cmd"))).toBe("ok");
+  });
+
+  it("keeps the first value of a duplicated key", () => {
+    const json = '{"cmd": "first", "cmd": "second"}';
+    expect(readStringSpan(json, scanTopLevelFields(json, ["cmd"]).get("cmd"))).toBe("first");
+  });
+
+  it("stops once every requested key has been found", () => {
+    const json = '{"conversationId": "c1", "messages": [{"role": "us';
+    const fields = scanTopLevelFields(json, ["conversationId"]);
+    expect(readStringSpan(json, fields.get("conversationId"))).toBe("c1");
+  });
+
+  it("reports complete fields of a truncated buffer", () => {
+    const fields = scanTopLevelFields('{"command": "git status", "timeout": 12', [
+      "command",
+      "timeout",
+    ]);
+    expect(fields.has("command")).toBe(true);
+    expect(fields.has("timeout")).toBe(false);
+  });
+
+  it("returns nothing for non-object input", () => {
+    expect(scanTopLevelFields("plain text", ["command"]).size).toBe(0);
+    expect(scanTopLevelFields("[1, 2]", ["command"]).size).toBe(0);
+  });
+});
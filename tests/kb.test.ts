@@ -1,5 +1,5 @@
 import { describe, expect, it } from "vitest";
-import { chunkContentApiPath } from "../src/kb/client.js";
+import { chunkContentApiPath, parseKbBody } from "../src/kb/client.js";
 
 describe("chunkContentApiPath", () => {
   it("builds path for simple chunk ids", () => {
@@ -14,3 +14,19 @@ describe("chunkContentApiPath", () => {
     expect(chunkContentApiPath("/foo/bar/")).toBe("/v1/chunk/foo/bar/content");
   });
 });
+
+describe("parseKbBody", () => {
+  it("parses JSON bodies", () => {
+    expect(parseKbBody('{"detail":"missing"}')).toEqual({ detail: "missing" });
+    expect(parseKbBody(" [1, 2]")).toEqual([1, 2]);
+  });
+
+  it("returns plain-text and malformed bodies as-is", () => {
+    expect(parseKbBody("Internal Server Error")).toBe("Internal Server Error");
+    expect(parseKbBody("{not json")).toBe("{not json");
+  });
+
+  it("maps an empty body to null", () => {
+    expect(parseKbBody("")).toBeNull();
+  });
+});
@@ -4,7 +4,6 @@ import {
   partitionMarkdown,
   remendMarkdownTail,
 } from "../src/chat/markdown-stream.js";
-import { isUnifiedDiffText } from "../src/platform/diff.js";
 import { plainTextFromMarkdown } from "../src/platform/markdown.js";
 
 describe("partitionMarkdown", () => {
@@ -28,13 +27,6 @@ describe("remendMarkdownTail", () => {
   });
 });
 
-describe("isUnifiedDiffText", () => {
-  it("detects unified diff headers", () => {
-    const diff = "--- a/foo\n+++ b/foo\n@@ -1 +1 @@\n-old\n+new";
-    expect(isUnifiedDiffText(diff)).toBe(true);
-  });
-});
-
 describe("MarkdownStreamSession", () => {
   it("only extends stable cache when a new block completes", () => {
     const session = new MarkdownStreamSession();
@@ -52,6 +44,25 @@ describe("MarkdownStreamSession", () => {
     expect(drained.length).toBe(1);
     expect(session.drainNewStableBlocks()).toEqual([]);
   });
+
+  it("matches a full partition when text arrives in small deltas", () => {
+    const text = "Intro\n\n```js\nconst x = 1\n\nmore\n```\n\nSecond\nline\n\n\n- a\n- b\n\nEnd";
+    const session = new MarkdownStreamSession();
+    for (let i = 1; i < text.length; i += 3) {
+      // A trailing newline may flush a block early; keep deltas mid-line.
+      if (text[i - 1] !== "\n") session.sync(text.slice(0, i));
+    }
+    const last = session.sync(text);
+    expect(last.frozenDisplay).toBe(partitionMarkdown(text).stableBlocks.join("\n\n"));
+    expect(last.tailDisplay).toBe("End");
+  });
+
+  it("rescans when the text is replaced rather than appended", () => {
+    const session = new MarkdownStreamSession();
+    session.sync("First\n\nSecond\n\nTail");
+    const out = session.sync("Other\n\nNew tail");
+    expect(out.tailDisplay).toBe("New tail");
+  });
 });
 
 describe("plainTextFromMarkdown", () => {
@@ -6,17 +6,44 @@ import { createHash } from "node:crypto";
 import { existsSync, mkdirSync, readFileSync, rmSync, writeFileSync } from "node:fs";
 import { tmpdir } from "node:os";
 import { join } from "node:path";
-import { afterEach, beforeEach, describe, expect, it } from "vitest";
+import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
+import type { CatalogEntry } from "../src/skills/catalog";
+import { installSkill } from "../src/skills/install";
+import { scanInstalledSkills } from "../src/skills/scan";
+import { runSkillsUpdateCore } from "../src/skills/update";
 
 let testDir: string;
 
+/** Catalog entry for `name`; tests override only the fields they assert on. */
+function catalogEntry(name: string, overrides: Partial<CatalogEntry> = {}): CatalogEntry {
+  return {
+    name,
+    version: "1.0.0",
+    description: "test",
+    author: "cnoe",
+    tags: [],
+    url: "https://x.com",
+    checksum: "sha256:x",
+    ...overrides,
+  };
+}
+
+function catalogResponse(...skills: CatalogEntry[]): Promise<Response> {
+  const catalog = { version: "1", generated: new Date().toISOString(), skills };
+  return Promise.resolve(new Response(JSON.stringify(catalog), { status: 200 }));
+}
+
 beforeEach(() => {
   testDir = join(tmpdir(), `caipe-skills-${process.pid}-${Date.now()}`);
   mkdirSync(testDir, { recursive: true });
   process.env.XDG_CONFIG_HOME = testDir;
+  // install/update report progress on stdout; nothing here asserts on it.
+  vi.spyOn(process.stdout, "write").mockImplementation(() => true);
 });
 
 afterEach(() => {
+  vi.restoreAllMocks();
+  vi.unstubAllGlobals();
   process.env.XDG_CONFIG_HOME = "";
   // Reset cwd to a stable directory before deleting testDir to avoid
   // process.cwd() throwing ENOENT in subsequent tests.
@@ -33,13 +60,12 @@ afterEach(() => {
 // ── parseFrontmatter (via scan.ts) ────────────────────────────────────────────
 
 describe("scanInstalledSkills", () => {
-  it("returns empty array when no skills directory exists", async () => {
-    const { scanInstalledSkills } = await import("../src/skills/scan");
+  it("returns empty array when no skills directory exists", () => {
     const skills = scanInstalledSkills(testDir);
     expect(skills).toHaveLength(0);
   });
 
-  it("parses skills from .claude/ directory", async () => {
+  it("parses skills from .claude/ directory", () => {
     // Create fake git repo with .claude/
     const projectDir = join(testDir, "project");
     mkdirSync(join(projectDir, ".git"), { recursive: true });
@@ -49,7 +75,6 @@ describe("scanInstalledSkills", () => {
       "---\nname: my-skill\nversion: 1.0.0\ndescription: A test skill\n---\n# Skill Body\n",
     );
 
-    const { scanInstalledSkills } = await import("../src/skills/scan");
     const skills = scanInstalledSkills(projectDir);
     expect(skills).toHaveLength(1);
     expect(skills[0]?.name).toBe("my-skill");
@@ -57,18 +82,30 @@ describe("scanInstalledSkills", () => {
     expect(skills[0]?.scope).toBe("project");
   });
 
-  it("ignores .md files without valid frontmatter", async () => {
+  it("ignores .md files without valid frontmatter", () => {
     const projectDir = join(testDir, "project2");
     mkdirSync(join(projectDir, ".git"), { recursive: true });
     mkdirSync(join(projectDir, ".claude"), { recursive: true });
     writeFileSync(join(projectDir, ".claude", "no-fm.md"), "# No frontmatter");
 
-    const { scanInstalledSkills } = await import("../src/skills/scan");
     const skills = scanInstalledSkills(projectDir);
     expect(skills).toHaveLength(0);
   });
 
-  it("global skills are returned when no project .claude/ exists", async () => {
+  it("re-reads a skill file rewritten in place with the same size", () => {
+    const projectDir = join(testDir, "project3");
+    mkdirSync(join(projectDir, ".git"), { recursive: true });
+    mkdirSync(join(projectDir, ".claude"), { recursive: true });
+    const skillPath = join(projectDir, ".claude", "my-skill.md");
+    writeFileSync(skillPath, "---\nname: my-skill\nversion: 1.0.0\n---\n");
+
+    expect(scanInstalledSkills(projectDir)[0]?.version).toBe("1.0.0");
+
+    writeFileSync(skillPath, "---\nname: my-skill\nversion: 1.1.0\n---\n");
+    expect(scanInstalledSkills(projectDir)[0]?.version).toBe("1.1.0");
+  });
+
+  it("global skills are returned when no project .claude/ exists", () => {
     // Global skills dir
     const configDir = join(testDir, "caipe");
     mkdirSync(join(configDir, "skills"), { recursive: true });
@@ -77,7 +114,6 @@ describe("scanInstalledSkills", () => {
       "---\nname: global-skill\nversion: 2.0.0\ndescription: Global\n---\n",
     );
 
-    const { scanInstalledSkills } = await import("../src/skills/scan");
     const skills = scanInstalledSkills(testDir); // testDir has no .git
     expect(skills.some((s) => s.name === "global-skill")).toBe(true);
   });
@@ -94,41 +130,26 @@ describe("installSkill", () => {
     const content = "---\nname: test-skill\nversion: 1.0.0\ndescription: Test\n---\n# Test\n";
     const hash = createHash("sha256").update(content, "utf8").digest("hex");
 
-    const originalFetch = global.fetch;
     let fetchCalled = false;
-    global.fetch = ((url: string) => {
+    vi.stubGlobal("fetch", (url: string) => {
       fetchCalled = true;
       if (String(url).includes("catalog.json")) {
-        return Promise.resolve(
-          new Response(
-            JSON.stringify({
-              version: "1",
-              generated: new Date().toISOString(),
-              skills: [
-                {
-                  name: "test-skill",
-                  version: "1.0.0",
-                  description: "Test",
-                  author: "cnoe",
-                  tags: [],
-                  url: "https://example.com/test-skill.md",
-                  checksum: `sha256:${hash}`,
-                },
-              ],
-            }),
-            { status: 200 },
-          ),
+        return catalogResponse(
+          catalogEntry("test-skill", {
+            description: "Test",
+            url: "https://example.com/test-skill.md",
+            checksum: `sha256:${hash}`,
+          }),
         );
       }
       if (String(url).includes("test-skill.md")) {
         return Promise.resolve(new Response(content, { status: 200 }));
       }
       return Promise.resolve(new Response("not found", { status: 404 }));
-    }) as unknown as typeof fetch;
+    });
 
     process.chdir(projectDir);
     try {
-      const { installSkill } = await import("../src/skills/install");
       await installSkill("test-skill", {});
 
       const destPath = join(projectDir, ".claude", "test-skill.md");
@@ -136,7 +157,6 @@ describe("installSkill", () => {
       expect(readFileSync(destPath, "utf8")).toBe(content);
       expect(fetchCalled).toBe(true);
     } finally {
-      global.fetch = originalFetch;
       process.chdir(testDir);
     }
   });
@@ -153,28 +173,16 @@ describe("installSkill", () => {
     const content = "---\nname: existing-skill\nversion: 1.1.0\ndescription: existing\n---\n";
     const hash = createHash("sha256").update(content, "utf8").digest("hex");
 
-    const originalFetch = global.fetch;
-    global.fetch = (() =>
-      Promise.resolve(
-        new Response(
-          JSON.stringify({
-            version: "1",
-            generated: new Date().toISOString(),
-            skills: [
-              {
-                name: "existing-skill",
-                version: "1.1.0",
-                description: "existing",
-                author: "cnoe",
-                tags: [],
-                url: "https://example.com/existing-skill.md",
-                checksum: `sha256:${hash}`,
-              },
-            ],
-          }),
-          { status: 200 },
-        ),
-      )) as unknown as typeof fetch;
+    vi.stubGlobal("fetch", () =>
+      catalogResponse(
+        catalogEntry("existing-skill", {
+          version: "1.1.0",
+          description: "existing",
+          url: "https://example.com/existing-skill.md",
+          checksum: `sha256:${hash}`,
+        }),
+      ),
+    );
 
     const originalExit = process.exit;
     let exitCode: number | undefined;
@@ -185,12 +193,10 @@ describe("installSkill", () => {
 
     process.chdir(projectDir);
     try {
-      const { installSkill } = await import("../src/skills/install");
       await installSkill("existing-skill", {});
     } catch {
       /* expected */
     } finally {
-      global.fetch = originalFetch;
       process.exit = originalExit;
       process.chdir(testDir);
     }
@@ -199,14 +205,7 @@ describe("installSkill", () => {
   });
 
   it("exits 1 when skill not found in catalog", async () => {
-    const originalFetch = global.fetch;
-    global.fetch = (() =>
-      Promise.resolve(
-        new Response(
-          JSON.stringify({ version: "1", generated: new Date().toISOString(), skills: [] }),
-          { status: 200 },
-        ),
-      )) as unknown as typeof fetch;
+    vi.stubGlobal("fetch", () => catalogResponse());
 
     const originalExit = process.exit;
     let exitCode: number | undefined;
@@ -216,12 +215,10 @@ describe("installSkill", () => {
     }) as typeof process.exit;
 
     try {
-      const { installSkill } = await import("../src/skills/install");
       await installSkill("nonexistent-skill", {});
     } catch {
       /* expected */
     } finally {
-      global.fetch = originalFetch;
       process.exit = originalExit;
     }
 
@@ -241,36 +238,13 @@ describe("runSkillsUpdateCore", () => {
       "---\nname: my-skill\nversion: 1.1.0\ndescription: test\n---\n",
     );
 
-    const originalFetch = global.fetch;
-    global.fetch = (() =>
-      Promise.resolve(
-        new Response(
-          JSON.stringify({
-            version: "1",
-            generated: new Date().toISOString(),
-            skills: [
-              {
-                name: "my-skill",
-                version: "1.1.0",
-                description: "test",
-                author: "cnoe",
-                tags: [],
-                url: "https://x.com",
-                checksum: "sha256:x",
-              },
-            ],
-          }),
-          { status: 200 },
-        ),
-      )) as unknown as typeof fetch;
+    vi.stubGlobal("fetch", () => catalogResponse(catalogEntry("my-skill", { version: "1.1.0" })));
 
     process.chdir(projectDir);
     try {
-      const { runSkillsUpdateCore } = await import("../src/skills/update");
       const report = await runSkillsUpdateCore(undefined, { all: true, dryRun: true });
       expect(report.upToDate).toContain("my-skill");
     } finally {
-      global.fetch = originalFetch;
       process.chdir(testDir);
     }
   });
@@ -284,39 +258,16 @@ describe("runSkillsUpdateCore", () => {
       "---\nname: my-skill\nversion: 1.0.0\ndescription: test\n---\n",
     );
 
-    const originalFetch = global.fetch;
-    global.fetch = (() =>
-      Promise.resolve(
-        new Response(
-          JSON.stringify({
-            version: "1",
-            generated: new Date().toISOString(),
-            skills: [
-              {
-                name: "my-skill",
-                version: "1.1.0",
-                description: "test",
-                author: "cnoe",
-                tags: [],
-                url: "https://x.com",
-                checksum: "sha256:x",
-              },
-            ],
-          }),
-          { status: 200 },
-        ),
-      )) as unknown as typeof fetch;
+    vi.stubGlobal("fetch", () => catalogResponse(catalogEntry("my-skill", { version: "1.1.0" })));
 
     process.chdir(projectDir);
     try {
-      const { runSkillsUpdateCore } = await import("../src/skills/update");
       const report = await runSkillsUpdateCore(undefined, { all: true, dryRun: true });
       expect(report.updated).toContain("my-skill");
       // File should not be modified
       const content = readFileSync(join(projectDir, ".claude", "my-skill.md"), "utf8");
       expect(content).toContain("1.0.0");
     } finally {
-      global.fetch = originalFetch;
       process.chdir(testDir);
     }
   });
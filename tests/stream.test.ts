@@ -9,10 +9,10 @@
  *  - Terminal events (RUN_FINISHED) stop the stream
  */
 
-import { describe, expect, it, vi } from "vitest";
+import { afterEach, describe, expect, it, vi } from "vitest";
 import { DEFAULT_AGENT } from "../src/agents/types";
 import { AguiAdapter, createAdapter } from "../src/chat/stream";
-import type { SendPayload } from "../src/chat/stream";
+import type { SendPayload, StreamEvent } from "../src/chat/stream";
 
 const SERVER_URL = "https://caipe.test/api/v1/chat/stream/start";
 const PAYLOAD: SendPayload = {
@@ -32,234 +32,184 @@ const sseFrame = (eventType: string, payload: Record<string, unknown>): string =
   return `event: ${eventType}\ndata: ${data}\n\n`;
 };
 
+// Helper: 200 text/event-stream response that delivers each string as a separate read
+const chunkedSseResponse = (...chunks: string[]): Response => {
+  const encoder = new TextEncoder();
+  const body = new ReadableStream({
+    start(controller) {
+      for (const chunk of chunks) controller.enqueue(encoder.encode(chunk));
+      controller.close();
+    },
+  });
+  return new Response(body, { status: 200, headers: { "Content-Type": "text/event-stream" } });
+};
+
+// Helper: 200 text/event-stream response whose body is the given frames in one chunk
+const sseResponse = (...frames: string[]): Response => chunkedSseResponse(frames.join(""));
+
+// Helper: replace global fetch for one test (restored in afterEach)
+const stubFetch = (impl: (...args: Parameters<typeof fetch>) => Promise<Response>) => {
+  const mock = vi.fn(impl);
+  vi.stubGlobal("fetch", mock);
+  return mock;
+};
+
+const collectEvents = async (payload: SendPayload = PAYLOAD): Promise<StreamEvent[]> => {
+  const adapter = new AguiAdapter(DEFAULT_AGENT, SERVER_URL, getToken);
+  const events: StreamEvent[] = [];
+  for await (const ev of adapter.connect(payload)) {
+    events.push(ev);
+  }
+  return events;
+};
+
+afterEach(() => {
+  vi.unstubAllGlobals();
+});
+
 // ── AguiAdapter ───────────────────────────────────────────────────────────────
 
 describe("AguiAdapter", () => {
   it("maps TEXT_MESSAGE_CONTENT to token events", async () => {
-    const mockBody = new ReadableStream({
-      start(controller) {
-        controller.enqueue(
-          new TextEncoder().encode(
-            sseFrame("RUN_STARTED", { runId: "r1" }) +
-              sseFrame("TEXT_MESSAGE_START", { messageId: "m1", role: "assistant" }) +
-              sseFrame("TEXT_MESSAGE_CONTENT", { messageId: "m1", delta: "Hello " }) +
-              sseFrame("TEXT_MESSAGE_CONTENT", { messageId: "m1", delta: "world!" }) +
-              sseFrame("TEXT_MESSAGE_END", { messageId: "m1" }) +
-              sseFrame("RUN_FINISHED", { runId: "r1", outcome: "success" }),
-          ),
-        );
-        controller.close();
-      },
-    });
-
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(
-        new Response(mockBody, { status: 200, headers: { "Content-Type": "text/event-stream" } }),
+    stubFetch(async () =>
+      sseResponse(
+        sseFrame("RUN_STARTED", { runId: "r1" }),
+        sseFrame("TEXT_MESSAGE_START", { messageId: "m1", role: "assistant" }),
+        sseFrame("TEXT_MESSAGE_CONTENT", { messageId: "m1", delta: "Hello " }),
+        sseFrame("TEXT_MESSAGE_CONTENT", { messageId: "m1", delta: "world!" }),
+        sseFrame("TEXT_MESSAGE_END", { messageId: "m1" }),
+        sseFrame("RUN_FINISHED", { runId: "r1", outcome: "success" }),
       ),
-    ) as unknown as typeof fetch;
-
-    try {
-      const adapter = new AguiAdapter(DEFAULT_AGENT, SERVER_URL, getToken);
-      const events = [];
-      for await (const ev of adapter.connect(PAYLOAD)) {
-        events.push(ev);
-      }
-
-      const tokens = events.filter((e) => e.type === "token");
-      expect(tokens).toHaveLength(2);
-      expect((tokens[0] as { text: string }).text).toBe("Hello ");
-      expect((tokens[1] as { text: string }).text).toBe("world!");
-
-      const done = events.find((e) => e.type === "done");
-      expect(done).toBeDefined();
-    } finally {
-      global.fetch = originalFetch;
-    }
+    );
+
+    const events = await collectEvents();
+
+    const tokens = events.filter((e) => e.type === "token");
+    expect(tokens).toHaveLength(2);
+    expect((tokens[0] as { text: string }).text).toBe("Hello ");
+    expect((tokens[1] as { text: string }).text).toBe("world!");
+
+    const done = events.find((e) => e.type === "done");
+    expect(done).toBeDefined();
   });
 
   it("emits error event on non-200 response", async () => {
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(new Response("Internal Server Error", { status: 500 })),
-    ) as unknown as typeof fetch;
-
-    try {
-      const adapter = new AguiAdapter(DEFAULT_AGENT, SERVER_URL, getToken);
-      const events = [];
-      for await (const ev of adapter.connect(PAYLOAD)) {
-        events.push(ev);
-      }
-
-      const errEv = events.find((e) => e.type === "error");
-      expect(errEv).toBeDefined();
-      expect((errEv as { message: string }).message).toContain("500");
-    } finally {
-      global.fetch = originalFetch;
-    }
+    stubFetch(async () => new Response("Internal Server Error", { status: 500 }));
+
+    const events = await collectEvents();
+
+    const errEv = events.find((e) => e.type === "error");
+    expect(errEv).toBeDefined();
+    expect((errEv as { message: string }).message).toContain("500");
   });
 
   it("maps TOOL_CALL_START to tool events", async () => {
-    const mockBody = new ReadableStream({
-      start(controller) {
-        controller.enqueue(
-          new TextEncoder().encode(
-            sseFrame("RUN_STARTED", { runId: "r1" }) +
-              sseFrame("TOOL_CALL_START", { toolCallId: "tc1", toolCallName: "search_github" }) +
-              sseFrame("TOOL_CALL_END", { toolCallId: "tc1" }) +
-              sseFrame("RUN_FINISHED", { runId: "r1", outcome: "success" }),
-          ),
-        );
-        controller.close();
-      },
-    });
-
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(
-        new Response(mockBody, { status: 200, headers: { "Content-Type": "text/event-stream" } }),
+    stubFetch(async () =>
+      sseResponse(
+        sseFrame("RUN_STARTED", { runId: "r1" }),
+        sseFrame("TOOL_CALL_START", { toolCallId: "tc1", toolCallName: "search_github" }),
+        sseFrame("TOOL_CALL_END", { toolCallId: "tc1" }),
+        sseFrame("RUN_FINISHED", { runId: "r1", outcome: "success" }),
       ),
-    ) as unknown as typeof fetch;
-
-    try {
-      const adapter = new AguiAdapter(DEFAULT_AGENT, SERVER_URL, getToken);
-      const events = [];
-      for await (const ev of adapter.connect(PAYLOAD)) {
-        events.push(ev);
-      }
-
-      const toolEv = events.find((e) => e.type === "tool");
-      expect(toolEv).toBeDefined();
-      expect((toolEv as { name: string }).name).toBe("search_github");
-    } finally {
-      global.fetch = originalFetch;
-    }
+    );
+
+    const events = await collectEvents();
+
+    const toolEv = events.find((e) => e.type === "tool");
+    expect(toolEv).toBeDefined();
+    expect((toolEv as { name: string }).name).toBe("search_github");
   });
 
   it("maps TOOL_CALL_END and TOOL_CALL_RESULT", async () => {
-    const mockBody = new ReadableStream({
-      start(controller) {
-        controller.enqueue(
-          new TextEncoder().encode(
-            sseFrame("RUN_STARTED", { runId: "r1" }) +
-              sseFrame("TOOL_CALL_START", { toolCallId: "tc1", toolCallName: "write_file" }) +
-              sseFrame("TOOL_CALL_ARGS", { toolCallId: "tc1", delta: '{"path":"a.ts"}' }) +
-              sseFrame("TOOL_CALL_END", { toolCallId: "tc1" }) +
-              sseFrame("TOOL_CALL_RESULT", {
-                messageId: "m1",
-                toolCallId: "tc1",
-                content: '{"status":"ok"}',
-              }) +
-              sseFrame("RUN_FINISHED", { runId: "r1", outcome: "success" }),
-          ),
-        );
-        controller.close();
-      },
-    });
-
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(
-        new Response(mockBody, { status: 200, headers: { "Content-Type": "text/event-stream" } }),
+    stubFetch(async () =>
+      sseResponse(
+        sseFrame("RUN_STARTED", { runId: "r1" }),
+        sseFrame("TOOL_CALL_START", { toolCallId: "tc1", toolCallName: "write_file" }),
+        sseFrame("TOOL_CALL_ARGS", { toolCallId: "tc1", delta: '{"path":"a.ts"}' }),
+        sseFrame("TOOL_CALL_END", { toolCallId: "tc1" }),
+        sseFrame("TOOL_CALL_RESULT", {
+          messageId: "m1",
+          toolCallId: "tc1",
+          content: '{"status":"ok"}',
+        }),
+        sseFrame("RUN_FINISHED", { runId: "r1", outcome: "success" }),
       ),
-    ) as unknown as typeof fetch;
-
-    try {
-      const adapter = new AguiAdapter(DEFAULT_AGENT, SERVER_URL, getToken);
-      const events = [];
-      for await (const ev of adapter.connect(PAYLOAD)) {
-        events.push(ev);
-      }
-
-      expect(events.some((e) => e.type === "tool-end")).toBe(true);
-      const result = events.find((e) => e.type === "tool-result");
-      expect(result).toBeDefined();
-      expect((result as { content: string }).content).toContain("ok");
-    } finally {
-      global.fetch = originalFetch;
-    }
+    );
+
+    const events = await collectEvents();
+
+    expect(events.some((e) => e.type === "tool-end")).toBe(true);
+    const result = events.find((e) => e.type === "tool-result");
+    expect(result).toBeDefined();
+    expect((result as { content: string }).content).toContain("ok");
   });
 
   it("maps RUN_ERROR to error events and stops stream", async () => {
+    stubFetch(async () =>
+      sseResponse(
+        sseFrame("RUN_STARTED", { runId: "r1" }),
+        sseFrame("RUN_ERROR", { message: "Agent execution failed" }),
+      ),
+    );
+
+    const events = await collectEvents();
+
+    const errEv = events.find((e) => e.type === "error");
+    expect(errEv).toBeDefined();
+    expect((errEv as { message: string }).message).toContain("Agent execution failed");
+  });
+
+  it("cancels the response body once a terminal event arrives", async () => {
+    const cancel = vi.fn();
     const mockBody = new ReadableStream({
       start(controller) {
+        // Server keeps the stream open after RUN_FINISHED.
         controller.enqueue(
           new TextEncoder().encode(
             sseFrame("RUN_STARTED", { runId: "r1" }) +
-              sseFrame("RUN_ERROR", { message: "Agent execution failed" }),
+              sseFrame("RUN_FINISHED", { runId: "r1", outcome: "success" }),
           ),
         );
-        controller.close();
       },
+      cancel,
     });
-
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(
+    stubFetch(
+      async () =>
         new Response(mockBody, { status: 200, headers: { "Content-Type": "text/event-stream" } }),
-      ),
-    ) as unknown as typeof fetch;
-
-    try {
-      const adapter = new AguiAdapter(DEFAULT_AGENT, SERVER_URL, getToken);
-      const events = [];
-      for await (const ev of adapter.connect(PAYLOAD)) {
-        events.push(ev);
-      }
-
-      const errEv = events.find((e) => e.type === "error");
-      expect(errEv).toBeDefined();
-      expect((errEv as { message: string }).message).toContain("Agent execution failed");
-    } finally {
-      global.fetch = originalFetch;
-    }
+    );
+
+    const events = await collectEvents();
+
+    expect(events[events.length - 1]?.type).toBe("done");
+    expect(cancel).toHaveBeenCalledTimes(1);
   });
 
   it("emits conversation event without POST when conversationId is set", async () => {
-    let fetchCalls = 0;
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn((url) => {
-      fetchCalls++;
+    const fetchMock = stubFetch(async (url) => {
       expect(String(url)).toContain("stream/start");
-      return Promise.resolve(new Response("error", { status: 503 }));
-    }) as unknown as typeof fetch;
-
-    try {
-      const adapter = new AguiAdapter(DEFAULT_AGENT, SERVER_URL, getToken);
-      const events = [];
-      for await (const ev of adapter.connect(PAYLOAD)) {
-        events.push(ev);
-      }
-      expect(fetchCalls).toBe(1);
-      expect(events[0]).toEqual({
-        type: "conversation",
-        conversationId: "bff-conv-existing",
-      });
-    } finally {
-      global.fetch = originalFetch;
-    }
+      return new Response("error", { status: 503 });
+    });
+
+    const events = await collectEvents();
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(events[0]).toEqual({
+      type: "conversation",
+      conversationId: "bff-conv-existing",
+    });
   });
 
   it("uses agentName from payload when agent name is 'default'", async () => {
     let capturedBody = "";
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn((_url, init) => {
+    stubFetch(async (_url, init) => {
       capturedBody = (init?.body as string) ?? "";
-      return Promise.resolve(new Response("error", { status: 503 }));
-    }) as unknown as typeof fetch;
-
-    try {
-      const customPayload: SendPayload = { ...PAYLOAD, agentName: "my-agent" };
-      const adapter = new AguiAdapter(DEFAULT_AGENT, SERVER_URL, getToken);
-      for await (const _ of adapter.connect(customPayload)) {
-        /* drain */
-      }
-
-      const body = JSON.parse(capturedBody) as Record<string, unknown>;
-      expect(body.agent_id).toBe("my-agent");
-    } finally {
-      global.fetch = originalFetch;
-    }
+      return new Response("error", { status: 503 });
+    });
+
+    await collectEvents({ ...PAYLOAD, agentName: "my-agent" });
+
+    const body = JSON.parse(capturedBody) as Record<string, unknown>;
+    expect(body.agent_id).toBe("my-agent");
   });
 });
 
@@ -277,43 +227,62 @@ describe("createAdapter", () => {
 describe("token accumulation", () => {
   it("accumulates full response across multiple TEXT_MESSAGE_CONTENT events", async () => {
     const parts = ["Hello", ", ", "world", "!"];
-    const frames = parts
-      .map((delta) => sseFrame("TEXT_MESSAGE_CONTENT", { messageId: "m1", delta }))
-      .join("");
+    stubFetch(async () =>
+      sseResponse(
+        sseFrame("RUN_STARTED", { runId: "r1" }),
+        ...parts.map((delta) => sseFrame("TEXT_MESSAGE_CONTENT", { messageId: "m1", delta })),
+        sseFrame("RUN_FINISHED", { runId: "r1", outcome: "success" }),
+      ),
+    );
 
-    const mockBody = new ReadableStream({
-      start(controller) {
-        controller.enqueue(
-          new TextEncoder().encode(
-            sseFrame("RUN_STARTED", { runId: "r1" }) +
-              frames +
-              sseFrame("RUN_FINISHED", { runId: "r1", outcome: "success" }),
-          ),
-        );
-        controller.close();
-      },
-    });
+    const collected = await collectEvents();
 
-    const originalFetch = global.fetch;
-    global.fetch = vi.fn(() =>
-      Promise.resolve(
-        new Response(mockBody, { status: 200, headers: { "Content-Type": "text/event-stream" } }),
+    const tokens = collected
+      .filter((e) => e.type === "token")
+      .map((e) => (e as { text: string }).text);
+    expect(tokens.join("")).toBe("Hello, world!");
+  });
+});
+
+// ── SSE chunking ──────────────────────────────────────────────────────────────
+
+describe("SSE chunking", () => {
+  const tokenTexts = (events: StreamEvent[]) =>
+    events.filter((e) => e.type === "token").map((e) => (e as { text: string }).text);
+
+  it("reassembles a data line split across two reads", async () => {
+    const frame = sseFrame("TEXT_MESSAGE_CONTENT", { messageId: "m1", delta: "Hello world" });
+    const cut = frame.indexOf("Hello") + 3;
+    stubFetch(async () => chunkedSseResponse(frame.slice(0, cut), frame.slice(cut)));
+
+    expect(tokenTexts(await collectEvents())).toEqual(["Hello world"]);
+  });
+
+  it("buffers reads that carry no newline until the line is terminated", async () => {
+    const delta = "x".repeat(64);
+    const frame = sseFrame("TEXT_MESSAGE_CONTENT", { messageId: "m1", delta });
+    const chunks: string[] = [];
+    for (let i = 0; i < frame.length; i += 7) chunks.push(frame.slice(i, i + 7));
+    expect(chunks.filter((c) => !c.includes("\n")).length).toBeGreaterThan(5);
+    stubFetch(async () => chunkedSseResponse(...chunks));
+
+    const events = await collectEvents();
+    expect(tokenTexts(events)).toEqual([delta]);
+    expect(events.at(-1)).toEqual({ type: "done", response: delta });
+  });
+
+  it("drops an unterminated frame at EOF and still finishes with the text so far", async () => {
+    // Per the SSE spec, an event cut off before its blank line is never dispatched.
+    const partial = `event: TEXT_MESSAGE_CONTENT\ndata: ${JSON.stringify({ delta: " lost" })}`;
+    stubFetch(async () =>
+      chunkedSseResponse(
+        sseFrame("TEXT_MESSAGE_CONTENT", { messageId: "m1", delta: "Hi" }),
+        partial,
       ),
-    ) as unknown as typeof fetch;
-
-    try {
-      const adapter = new AguiAdapter(DEFAULT_AGENT, SERVER_URL, getToken);
-      const collected = [];
-      for await (const ev of adapter.connect(PAYLOAD)) {
-        collected.push(ev);
-      }
-
-      const tokens = collected
-        .filter((e) => e.type === "token")
-        .map((e) => (e as { text: string }).text);
-      expect(tokens.join("")).toBe("Hello, world!");
-    } finally {
-      global.fetch = originalFetch;
-    }
+    );
+
+    const events = await collectEvents();
+    expect(tokenTexts(events)).toEqual(["Hi"]);
+    expect(events.at(-1)).toEqual({ type: "done", response: "Hi" });
   });
 });
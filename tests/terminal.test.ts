@@ -6,11 +6,31 @@ import {
 import { iterm2InlineImage } from "../src/platform/terminal/images.js";
 import { osc8Hyperlink, replaceMarkdownLinksWithOsc8 } from "../src/platform/terminal/links.js";
 
+/** OSC 8 introducer; one hyperlink contains it three times (open, url end, label end). */
+const OSC8 = "\x1b]8;;";
+
+// Pretend stdout is a TTY (optionally with a fixed width); undone after every test.
+const STDOUT_TTY_PROPS = ["isTTY", "columns"] as const;
+
+function fakeTty(columns?: number): void {
+  Object.defineProperty(process.stdout, "isTTY", { value: true, configurable: true });
+  if (columns !== undefined) {
+    Object.defineProperty(process.stdout, "columns", { value: columns, configurable: true });
+  }
+}
+
 describe("terminal capabilities", () => {
   const envBackup = { ...process.env };
+  const stdoutBackup = STDOUT_TTY_PROPS.map(
+    (key) => [key, Object.getOwnPropertyDescriptor(process.stdout, key)] as const,
+  );
 
   afterEach(() => {
     process.env = { ...envBackup };
+    for (const [key, descriptor] of stdoutBackup) {
+      if (descriptor) Object.defineProperty(process.stdout, key, descriptor);
+      else delete (process.stdout as unknown as Record<string, unknown>)[key];
+    }
   });
 
   it("disables rich features when NO_COLOR is set", () => {
@@ -25,35 +45,24 @@ describe("terminal capabilities", () => {
     delete process.env.NO_COLOR;
     process.env.TERM_PROGRAM = "iTerm.app";
     process.env.COLORTERM = "truecolor";
-    const tty = Object.getOwnPropertyDescriptor(process.stdout, "isTTY");
-    Object.defineProperty(process.stdout, "isTTY", { value: true, configurable: true });
-    try {
-      const caps = getTerminalCapabilities();
-      expect(caps.iterm2InlineImages).toBe(true);
-      expect(caps.osc8Links).toBe(true);
-    } finally {
-      if (tty) Object.defineProperty(process.stdout, "isTTY", tty);
-    }
+    fakeTty();
+    const caps = getTerminalCapabilities();
+    expect(caps.iterm2InlineImages).toBe(true);
+    expect(caps.osc8Links).toBe(true);
   });
 
   it("computes markdown layout width smaller than terminal columns", () => {
-    const tty = Object.getOwnPropertyDescriptor(process.stdout, "isTTY");
-    Object.defineProperty(process.stdout, "isTTY", { value: true, configurable: true });
-    Object.defineProperty(process.stdout, "columns", { value: 120, configurable: true });
-    try {
-      expect(getMarkdownLayoutWidth("full", 120)).toBe(115);
-      expect(getMarkdownLayoutWidth("assistant", 120)).toBe(113);
-      expect(getMarkdownLayoutWidth("user", 120)).toBe(113);
-    } finally {
-      if (tty) Object.defineProperty(process.stdout, "isTTY", tty);
-    }
+    fakeTty(120);
+    expect(getMarkdownLayoutWidth("full", 120)).toBe(115);
+    expect(getMarkdownLayoutWidth("assistant", 120)).toBe(113);
+    expect(getMarkdownLayoutWidth("user", 120)).toBe(113);
   });
 });
 
 describe("OSC 8 links", () => {
   it("wraps label with hyperlink escapes", () => {
     const out = osc8Hyperlink("https://example.com", "Example");
-    expect(out).toContain("\x1b]8;;");
+    expect(out).toContain(OSC8);
     expect(out).toContain("https://example.com");
     expect(out).toContain("Example");
   });
@@ -63,7 +72,7 @@ describe("OSC 8 links", () => {
     const out = replaceMarkdownLinksWithOsc8(md);
     expect(out).not.toContain("](https://");
     expect(out).toContain("Grid");
-    expect(out).toContain("\x1b]8;;");
+    expect(out.split(OSC8)).toHaveLength(4);
   });
 });
 
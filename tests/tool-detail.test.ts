@@ -0,0 +1,14 @@
+import { describe, expect, it } from "vitest";
+import { commandFromToolArgsBuffer } from "../src/chat/tool-detail.js";
+
+describe("commandFromToolArgsBuffer", () => {
+  it("reads the command once the string value is complete", () => {
+    expect(commandFromToolArgsBuffer('{"command": "npm te')).toBeUndefined();
+    expect(commandFromToolArgsBuffer('{"command": "npm test", "cwd": "/r')).toBe("npm test");
+  });
+
+  it("uses key priority for closed args objects", () => {
+    const args = JSON.stringify({ code: "print(1)", cmd: " make " });
+    expect(commandFromToolArgsBuffer(args)).toBe("make");
+  });
+});
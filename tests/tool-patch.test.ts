@@ -52,6 +52,11 @@ describe("patchFromToolResult", () => {
     expect(patch?.unifiedDiff).toBe(diff.trim());
   });
 
+  it("returns null for plain-text results from non-file tools", () => {
+    expect(patchFromToolResult("search_confluence", "Found 3 pages about {topic}")).toBeNull();
+    expect(patchFromToolResult("search_confluence", '{"status": "partial')).toBeNull();
+  });
+
   it("unwraps nested result JSON", () => {
     const inner = JSON.stringify({
       file_path: "README.md",
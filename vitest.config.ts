@@ -3,9 +3,12 @@ import { defineConfig } from "vitest/config";
 export default defineConfig({
   test: {
     environment: "node",
+    // Child processes, not worker threads: skills tests call process.chdir(),
+    // which worker threads do not support.
+    pool: "forks",
     setupFiles: ["./tests/setup.ts"],
     testTimeout: 15_000,
-    include: ["tests/**/*.test.ts", "tests/**/*.e2e.test.ts"],
+    include: ["tests/**/*.test.ts"],
   },
   resolve: {
     alias: {